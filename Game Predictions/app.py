@@ -15,21 +15,22 @@ import numpy as np
 import data_processing as dp
 import model_ensemble as ensemble
 import team_stats_cache as stats_cache
-import cached_matchup
-info = pd.read_csv('Data/game_results/games_2026.csv')
-info['team_location_key'] = info['team_location'].astype(str).str.strip().str.lower()
+import prediction_cache
+from bounded_cache import BoundedCache
+import team_names
+team_resolver = team_names.load_team_resolver(2026)
 
 
 def _team_key(team_name: str) -> str:
     return str(team_name).strip().lower()
 
 def get_team_color(team):
-    team_data = info[info['team_location_key'] == _team_key(team)]
-    if team_data.empty:
+    team_data = team_resolver.team_info(team)
+    if team_data is None:
         return DEFAULT_TEAM_COLOR
-    hex_color = str(team_data['team_color'].iloc[0])
+    hex_color = str(team_data['team_color'])
     if is_dark_color(hex_color):
-        hex_color = str(team_data['team_alternate_color'].iloc[0])
+        hex_color = str(team_data['team_alternate_color'])
     return "#" + hex_color, "#FFFFFF"
 
 def is_dark_color(hex_color, threshold=30):
@@ -64,14 +65,14 @@ def is_dark_color(hex_color, threshold=30):
     return all(value < threshold for value in (r, g, b))
 
 def get_logo_url(team_name):
-    logo_url = info[info['team_location_key'] == _team_key(team_name)]
-    if logo_url.empty:
+    team_data = team_resolver.team_info(team_name)
+    if team_data is None:
         return ""
-    url = logo_url['team_logo'].iloc[0]        
-    return url
+    return team_data['team_logo']
 
 # Default team colors for teams not in the dictionary
 DEFAULT_TEAM_COLOR = ('#333333', '#FFFFFF')  # Dark gray and white
+TEAM_FEATURE_CACHE_MAX_BYTES = 512 * 1024 ** 2
 
 REQUIRED_BASE_COLUMNS = [
     'team_score',
@@ -1087,7 +1088,8 @@ class NCAATeamMatchupApp(QMainWindow):
         super().__init__()
 
         # Prediction models (ensemble)
-        self.model_bundle = ensemble.load_models()
+        # Models load on the first prediction so the window opens without waiting on them.
+        self.model_bundle = None
         # App settings
         self.setWindowTitle("NCAA Team Matchup")
         self.setMinimumSize(1024, 768)
@@ -1100,7 +1102,7 @@ class NCAATeamMatchupApp(QMainWindow):
         self.right_year = self.selected_season
         self.selected_round = "Regular Season"
         self.conference_mapping = dp.load_conference_mapping()
-        self.team_feature_cache = {}
+        self.team_feature_cache = BoundedCache(TEAM_FEATURE_CACHE_MAX_BYTES, name="team_features")
         
         self.left_team_stats = TeamStats()
         self.right_team_stats = TeamStats()
@@ -1345,9 +1347,11 @@ class NCAATeamMatchupApp(QMainWindow):
         return self.teams_by_year.get(year, self.all_teams)
 
     def get_team_feature_data_for_season(self, season: int) -> pd.DataFrame:
-        if season not in self.team_feature_cache:
-            self.team_feature_cache[season] = stats_cache.load_team_stats_cache(season)
-        return self.team_feature_cache[season]
+        return self.team_feature_cache.get_or_load(
+            season,
+            lambda: stats_cache.load_team_stats_cache(season),
+            source_path=stats_cache.get_cache_path(season),
+        )
 
     def get_latest_team_snapshot(self, team_name: str, season: int) -> pd.Series | None:
         season_features = self.get_team_feature_data_for_season(season)
@@ -1550,21 +1554,13 @@ class NCAATeamMatchupApp(QMainWindow):
 
             left_team_home_away = 2 if season_type == 3 else 1
 
-            processed_data = cached_matchup.build_prediction_feature_row(
-                self.left_team,
-                self.right_team,
-                season=season_int,
-                season_type=season_type,
-                team_a_home_away=left_team_home_away,
+            winner_probs, spread_preds = prediction_cache.predict_matchups(
+                [(self.left_team, self.right_team, season_type, left_team_home_away)],
+                season_int,
+                self.model_bundle,
+                gui_adjustment=True,
             )
-
-            # Add the arbitrary point differential of 6.90 to the processed data
-            processed_data.loc[processed_data['team_home_away'] == 1, 'margin_estimate'] = processed_data['margin_estimate'] + 7.00
-            processed_data.loc[processed_data['team_home_away'] == 0, 'margin_estimate'] = processed_data['margin_estimate'] - 7.00
-            processed_data.loc[processed_data['team_home_away'] == 1, 'point_differential_avg_diff'] = processed_data['point_differential_avg_diff'] + 6.90
-            processed_data.loc[processed_data['team_home_away'] == 0, 'point_differential_avg_diff'] = processed_data['point_differential_avg_diff'] - 6.90
-
-            winner_prob, spread_pred = ensemble.predict_meta_ensemble(processed_data, self.model_bundle)
+            winner_prob, spread_pred = float(winner_probs[0]), float(spread_preds[0])
             team1_wins = winner_prob > 0.50
             team1_win_prob = round(winner_prob * 100, 2)
             team2_win_prob = round((1 - winner_prob) * 100, 2)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import sys
+import threading
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Approximate memory held by a cached value."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_nbytes(vars(value))
+    return sys.getsizeof(value)
+
+
+def _source_mtime(source_path: Path | str | None) -> int | None:
+    if source_path is None:
+        return None
+    try:
+        return Path(source_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    nbytes: int
+    source_path: Path | None
+    source_mtime: int | None
+
+
+class BoundedCache:
+    """
+    Least-recently-used cache bounded by an approximate byte budget.
+
+    Entries loaded from a file remember its mtime and are reloaded once the
+    file changes. The most recent entry is always kept, even if it alone
+    exceeds the budget.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "cache"):
+        self.max_bytes = int(max_bytes)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._fresh_entry(key) is not None
+
+    def _fresh_entry(self, key: Hashable) -> _CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.source_path is not None and _source_mtime(entry.source_path) != entry.source_mtime:
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._fresh_entry(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, source_path: Path | str | None = None) -> Any:
+        with self._lock:
+            return self._store(key, value, source_path, _source_mtime(source_path))
+
+    def _store(self, key: Hashable, value: Any, source_path: Path | str | None, source_mtime: int | None) -> Any:
+        self._entries.pop(key, None)
+        self._entries[key] = _CacheEntry(
+            value=value,
+            nbytes=estimate_nbytes(value),
+            source_path=Path(source_path) if source_path is not None else None,
+            source_mtime=source_mtime,
+        )
+        self._evict()
+        return value
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        source_path: Path | str | None = None,
+    ) -> Any:
+        with self._lock:
+            entry = self._fresh_entry(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            self.misses += 1
+            # Read the mtime before loading, so a file rewritten mid-load
+            # leaves the entry stale rather than pinned to the new mtime.
+            source_mtime = _source_mtime(source_path)
+            return self._store(key, loader(), source_path, source_mtime)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one entry, or every entry when `key` is None."""
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _evict(self) -> None:
+        total = self.current_bytes
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+            self.evictions += 1
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import numpy as np
+
+
+@dataclass
+class Slot:
+    """
+    A node in a bracket tree: either a seat holding `team` (an index into the
+    field) or the game between the winners of `top` and `bottom`. The winner
+    of a game is credited with reaching `round_key`.
+    """
+    team: int | None = None
+    top: Slot | None = None
+    bottom: Slot | None = None
+    round_key: str | None = None
+
+    @classmethod
+    def seat(cls, team: int) -> Slot:
+        return cls(team=int(team))
+
+    @classmethod
+    def game(cls, top: Slot, bottom: Slot, round_key: str) -> Slot:
+        return cls(top=top, bottom=bottom, round_key=round_key)
+
+    @property
+    def is_game(self) -> bool:
+        return self.team is None
+
+
+@dataclass
+class Bracket:
+    root: Slot
+    round_keys: list[str]
+
+
+@dataclass
+class CompiledBracket:
+    """
+    Index arrays for a bracket. Games are numbered in play order; a game's
+    `top`/`bottom` source is a column in a `(n_teams + n_games)` state where
+    column `t < n_teams` holds team `t` and column `n_teams + g` the winner
+    of game `g`. `levels` groups games that can be played together.
+    """
+    n_teams: int
+    round_keys: list[str]
+    game_top: np.ndarray
+    game_bottom: np.ndarray
+    game_round: np.ndarray
+    levels: list[np.ndarray]
+    team_entry_round: np.ndarray
+    game_top_teams: list[np.ndarray] = field(repr=False)
+    game_bottom_teams: list[np.ndarray] = field(repr=False)
+
+    @property
+    def n_games(self) -> int:
+        return len(self.game_top)
+
+    @property
+    def bye_rounds(self) -> np.ndarray:
+        """`(n_rounds, n_teams)` mask of rounds a team reaches without playing."""
+        return np.arange(len(self.round_keys))[:, None] < self.team_entry_round[None, :]
+
+    def forced_winners(self, completed_games: Sequence[tuple[int, int]]) -> np.ndarray:
+        """
+        Lock in decided games given as (winner, loser) team indices.
+
+        Returns each game's forced winner, or -1 while undecided. Both teams'
+        earlier games on the way to their meeting are locked as wins too.
+        """
+        forced = np.full(self.n_games, -1, dtype=np.intp)
+        game_teams = [np.concatenate([top, bottom]) for top, bottom in zip(self.game_top_teams, self.game_bottom_teams)]
+
+        def lock(game_idx: int, team: int) -> None:
+            if forced[game_idx] not in (-1, team):
+                raise ValueError(f"Game {game_idx} is already locked for team {forced[game_idx]}, not {team}.")
+            forced[game_idx] = team
+
+        for winner, loser in completed_games:
+            meeting = [
+                game_idx
+                for game_idx, (top, bottom) in enumerate(zip(self.game_top_teams, self.game_bottom_teams))
+                if (winner in top and loser in bottom) or (winner in bottom and loser in top)
+            ]
+            if not meeting:
+                raise ValueError(f"Teams {winner} and {loser} cannot meet in this bracket.")
+
+            game_idx = meeting[0]
+            lock(game_idx, int(winner))
+            for team in (int(winner), int(loser)):
+                for prior_idx, teams in enumerate(game_teams):
+                    if team in teams and len(teams) < len(game_teams[game_idx]):
+                        lock(prior_idx, team)
+        return forced
+
+    def matchup_pairs(self) -> np.ndarray:
+        """Every pair that can meet, as (i, j) with team `i` on the top side."""
+        pairs = [
+            np.stack(np.meshgrid(top, bottom, indexing='ij'), axis=-1).reshape(-1, 2)
+            for top, bottom in zip(self.game_top_teams, self.game_bottom_teams)
+        ]
+        return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=int)
+
+
+def single_elimination(entries: Sequence[int | Slot], round_keys: Sequence[str]) -> Slot:
+    """
+    Pair adjacent entries round by round. `entries` are seats (team indices)
+    or pre-built slots such as play-in games, listed in bracket order.
+    """
+    slots = [entry if isinstance(entry, Slot) else Slot.seat(entry) for entry in entries]
+    if len(slots) != 2 ** len(round_keys):
+        raise ValueError(f"{len(round_keys)} rounds need exactly {2 ** len(round_keys)} entries, got {len(slots)}.")
+
+    for round_key in round_keys:
+        slots = [Slot.game(slots[i], slots[i + 1], round_key) for i in range(0, len(slots), 2)]
+    return slots[0]
+
+
+def compile_bracket(bracket: Bracket, n_teams: int) -> CompiledBracket:
+    round_index = {key: idx for idx, key in enumerate(bracket.round_keys)}
+    games: list[tuple[Slot, int]] = []
+    seen_teams: set[int] = set()
+
+    def visit(slot: Slot) -> tuple[int, list[int]]:
+        if not slot.is_game:
+            if slot.team in seen_teams or not 0 <= slot.team < n_teams:
+                raise ValueError(f"Team index {slot.team} is duplicated or outside a field of {n_teams}.")
+            seen_teams.add(slot.team)
+            return 0, [slot.team]
+        if slot.top is None or slot.bottom is None:
+            raise ValueError("A game slot needs both a top and a bottom slot.")
+        if slot.round_key not in round_index:
+            raise ValueError(f"Unknown round '{slot.round_key}'. Expected one of {bracket.round_keys}.")
+
+        top_level, top_teams = visit(slot.top)
+        bottom_level, bottom_teams = visit(slot.bottom)
+        level = max(top_level, bottom_level) + 1
+        games.append((slot, level))
+        slot_teams[id(slot)] = (top_teams, bottom_teams)
+        return level, top_teams + bottom_teams
+
+    slot_teams: dict[int, tuple[list[int], list[int]]] = {}
+    visit(bracket.root)
+    if len(seen_teams) != n_teams:
+        raise ValueError(f"Bracket seats {len(seen_teams)} teams but the field has {n_teams}.")
+
+    order = sorted(range(len(games)), key=lambda idx: games[idx][1])
+    games = [games[idx] for idx in order]
+    game_column = {id(slot): n_teams + g for g, (slot, _) in enumerate(games)}
+
+    def column(slot: Slot) -> int:
+        return slot.team if not slot.is_game else game_column[id(slot)]
+
+    game_levels = np.array([level for _, level in games], dtype=int)
+    team_entry_round = np.full(n_teams, len(bracket.round_keys), dtype=int)
+    for slot, _ in games:
+        for child in (slot.top, slot.bottom):
+            if not child.is_game:
+                team_entry_round[child.team] = round_index[slot.round_key]
+
+    return CompiledBracket(
+        n_teams=n_teams,
+        round_keys=list(bracket.round_keys),
+        game_top=np.array([column(slot.top) for slot, _ in games], dtype=np.intp),
+        game_bottom=np.array([column(slot.bottom) for slot, _ in games], dtype=np.intp),
+        game_round=np.array([round_index[slot.round_key] for slot, _ in games], dtype=np.intp),
+        levels=[np.flatnonzero(game_levels == level) for level in np.unique(game_levels)],
+        team_entry_round=team_entry_round,
+        game_top_teams=[np.array(slot_teams[id(slot)][0], dtype=np.intp) for slot, _ in games],
+        game_bottom_teams=[np.array(slot_teams[id(slot)][1], dtype=np.intp) for slot, _ in games],
+    )
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from typing import Mapping
+
+import numpy as np
+
+from bracket import CompiledBracket
+from monte_carlo_sim import SimulatedBrackets
+
+DEFAULT_ROUND_POINTS = {
+    'round_of_32': 10,
+    'sweet_16': 20,
+    'elite_8': 40,
+    'final_4': 80,
+    'national_championship': 160,
+    'champion': 320,
+}
+
+_SCORE_CHUNK_SIZE = 20_000
+# Score-matrix cells (candidates plus opponents, times sims) held per chunk.
+_SCORE_CHUNK_ELEMENTS = 10_000_000
+
+
+def round_points_array(compiled: CompiledBracket, round_points: Mapping[str, float] | None = None) -> np.ndarray:
+    """Points per correct pick in each round; rounds missing from `round_points` (e.g. First Four) score 0."""
+    round_points = DEFAULT_ROUND_POINTS if round_points is None else round_points
+    return np.array([float(round_points.get(key, 0.0)) for key in compiled.round_keys])
+
+
+def round_indicators(picks: np.ndarray, compiled: CompiledBracket, weights: np.ndarray | None = None) -> np.ndarray:
+    """
+    Flatten brackets into `(n_brackets, n_rounds * n_teams)` round-winner
+    indicators, optionally weighted per round.
+
+    A team plays at most one game per round, so an entry's correct picks in
+    a round are the dot product of its and the outcome's indicators, and a
+    whole score matrix is one matrix product.
+    """
+    picks = np.atleast_2d(np.asarray(picks)).astype(np.intp)
+    n = compiled.n_teams
+    weights = np.ones(len(compiled.round_keys)) if weights is None else weights
+    indicators = np.zeros((picks.shape[0], len(compiled.round_keys) * n), dtype=np.float32)
+    rows = np.arange(picks.shape[0])
+    for game_idx, round_idx in enumerate(compiled.game_round):
+        indicators[rows, round_idx * n + picks[:, game_idx]] = weights[round_idx]
+    return indicators
+
+
+def _entry_points(entries: np.ndarray, compiled: CompiledBracket, round_points) -> np.ndarray:
+    entries = np.atleast_2d(np.asarray(entries))
+    if entries.shape[1] != compiled.n_games:
+        raise ValueError(f"Entries must pick {compiled.n_games} games, got {entries.shape[1]}.")
+    return round_indicators(entries, compiled, round_points_array(compiled, round_points))
+
+
+def _outcome_indicators(outcomes: SimulatedBrackets, chunk_size: int = _SCORE_CHUNK_SIZE):
+    """Round indicators of the simulated brackets, `chunk_size` sims at a time."""
+    for start in range(0, outcomes.sims, chunk_size):
+        yield round_indicators(np.asarray(outcomes.winners[start:start + chunk_size]), outcomes.compiled)
+
+
+def score_entries(
+    entries: np.ndarray,
+    outcomes: SimulatedBrackets,
+    round_points: Mapping[str, float] | None = None,
+) -> np.ndarray:
+    """
+    Score every entry against every simulated bracket.
+
+    `entries` is `(n_entries, n_games)` team indices in the same game order
+    as `outcomes.winners`. Returns `(n_entries, sims)` scores; use
+    `expected_scores` or `win_probabilities` when only the summary is needed.
+    """
+    entry_points = _entry_points(entries, outcomes.compiled, round_points)
+    scores = np.empty((entry_points.shape[0], outcomes.sims), dtype=np.float32)
+    start = 0
+    for indicators in _outcome_indicators(outcomes):
+        scores[:, start:start + indicators.shape[0]] = entry_points @ indicators.T
+        start += indicators.shape[0]
+    return scores
+
+
+def expected_scores(
+    entries: np.ndarray,
+    outcomes: SimulatedBrackets,
+    round_points: Mapping[str, float] | None = None,
+) -> np.ndarray:
+    """
+    Each entry's mean score over the simulated brackets. Scores are linear in
+    the outcome indicators, so this is the entries' points times the mean
+    indicators; no per-sim scores are built.
+    """
+    entry_points = _entry_points(entries, outcomes.compiled, round_points)
+    totals = np.zeros(entry_points.shape[1])
+    for indicators in _outcome_indicators(outcomes):
+        totals += indicators.sum(axis=0, dtype=np.float64)
+    return entry_points.astype(np.float64) @ (totals / max(outcomes.sims, 1))
+
+
+def _pool_wins_and_ties(entry_scores: np.ndarray, opponent_scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per entry, the sims it wins outright and its summed share of tied sims."""
+    best_opponent = opponent_scores.max(axis=0)
+    tied_opponents = (opponent_scores == best_opponent).sum(axis=0)
+    wins = (entry_scores > best_opponent).sum(axis=1)
+    ties = ((entry_scores == best_opponent) / (1.0 + tied_opponents)).sum(axis=1)
+    return wins, ties
+
+
+def pool_win_probability(entry_scores: np.ndarray, opponent_scores: np.ndarray) -> np.ndarray:
+    """
+    Chance each entry finishes first against all opponents, splitting ties
+    evenly with the opponents who share the top score.
+    """
+    wins, ties = _pool_wins_and_ties(entry_scores, opponent_scores)
+    return (wins + ties) / entry_scores.shape[1]
+
+
+def win_probabilities(
+    entries: np.ndarray,
+    opponents: np.ndarray,
+    outcomes: SimulatedBrackets,
+    round_points: Mapping[str, float] | None = None,
+) -> np.ndarray:
+    """
+    `pool_win_probability` over every simulated bracket, scoring entries and
+    opponents one outcome chunk at a time and keeping only running totals.
+    """
+    entry_points = _entry_points(entries, outcomes.compiled, round_points)
+    opponent_points = _entry_points(opponents, outcomes.compiled, round_points)
+    chunk_size = max(1, _SCORE_CHUNK_ELEMENTS // (entry_points.shape[0] + opponent_points.shape[0]))
+    wins = np.zeros(entry_points.shape[0])
+    ties = np.zeros(entry_points.shape[0])
+    for indicators in _outcome_indicators(outcomes, min(chunk_size, _SCORE_CHUNK_SIZE)):
+        chunk_wins, chunk_ties = _pool_wins_and_ties(entry_points @ indicators.T, opponent_points @ indicators.T)
+        wins += chunk_wins
+        ties += chunk_ties
+    return (wins + ties) / max(outcomes.sims, 1)
+
+
+def sample_entries(
+    outcomes: SimulatedBrackets,
+    n_entries: int,
+    rng: np.random.Generator,
+    distinct: bool = False,
+) -> np.ndarray:
+    """
+    Draw simulated brackets to use as entries, in sampling order. Repeats are
+    kept, as real pools repeat popular brackets; `distinct` drops them (for
+    candidate lists) while keeping the first draw of each.
+    """
+    rows = rng.choice(outcomes.sims, size=min(int(n_entries), outcomes.sims), replace=False)
+    entries = np.asarray(outcomes.winners[rows])
+    if distinct:
+        _, first = np.unique(entries, axis=0, return_index=True)
+        entries = entries[np.sort(first)]
+    return entries
+
+
+def chalk_entry(compiled: CompiledBracket, prob_matrix: np.ndarray) -> np.ndarray:
+    """The bracket that always advances the team favored in each game."""
+    n = compiled.n_teams
+    state = np.concatenate([np.arange(n), np.zeros(compiled.n_games, dtype=int)])
+    for games in compiled.levels:
+        a_idx = state[compiled.game_top[games]]
+        b_idx = state[compiled.game_bottom[games]]
+        state[n + games] = np.where(prob_matrix[a_idx, b_idx] >= 0.5, a_idx, b_idx)
+    return state[n:].astype(np.uint8)
+
+
+def optimize_entry(
+    outcomes: SimulatedBrackets,
+    candidates: np.ndarray | None = None,
+    *,
+    n_candidates: int = 2000,
+    opponents: np.ndarray | None = None,
+    n_opponents: int = 0,
+    round_points: Mapping[str, float] | None = None,
+    objective: str = 'expected',
+    seed=None,
+) -> tuple[np.ndarray, dict]:
+    """
+    Pick the candidate entry with the best expected score or pool win chance.
+
+    Candidates default to distinct simulated brackets. With
+    `objective='win'`, opponents (given, or `n_opponents` sampled brackets,
+    repeats included) are scored on the same simulations and the entry most
+    likely to finish first is returned. The second value holds every
+    candidate's metrics.
+    """
+    if objective not in ('expected', 'win'):
+        raise ValueError("objective must be 'expected' or 'win'.")
+
+    rng = np.random.default_rng(seed)
+    if candidates is None:
+        candidates = sample_entries(outcomes, n_candidates, rng, distinct=True)
+    metrics = {
+        'candidates': candidates,
+        'expected_score': expected_scores(candidates, outcomes, round_points),
+    }
+
+    if objective == 'win' or opponents is not None or n_opponents:
+        if opponents is None:
+            if not n_opponents:
+                raise ValueError("objective='win' needs opponents or n_opponents.")
+            opponents = sample_entries(outcomes, n_opponents, rng)
+        metrics['win_probability'] = win_probabilities(candidates, opponents, outcomes, round_points)
+
+    best = int(np.argmax(metrics['expected_score'] if objective == 'expected' else metrics['win_probability']))
+    return np.asarray(candidates[best]), metrics
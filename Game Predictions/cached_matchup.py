@@ -1,95 +1,233 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Sequence
 
+import numpy as np
 import pandas as pd
 
+from bounded_cache import BoundedCache
 import data_processing as dp
+import season_store
+import team_names
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "Data"
 CACHED_DATA_DIR = DATA_DIR / "cached_data"
 GAME_RESULTS_DIR = DATA_DIR / "game_results"
 
-_SEASON_DF_CACHE: dict[int, pd.DataFrame] = {}
-_TEAM_ID_MAP_CACHE: dict[int, dict[str, int]] = {}
+SEASON_CACHE_MAX_BYTES = 1024 ** 3
+STATE_CACHE_MAX_BYTES = 64 * 1024 ** 2
 
+_SEASON_DF_CACHE = BoundedCache(SEASON_CACHE_MAX_BYTES, name="season_rows")
+_SEASON_STATE_CACHE = BoundedCache(STATE_CACHE_MAX_BYTES, name="season_state")
 
-def _team_key(value: object) -> str:
-    return str(value).strip().lower()
+
+@dataclass
+class SeasonRowIndex:
+    """
+    Lookups built once per loaded season: each team's latest row position in
+    the sorted season frame, and the season's last game id and date.
+    """
+    latest_positions: dict[int, int]
+    max_game_id: int
+    max_game_date: pd.Timestamp
+
+
+def _build_season_index(season_rows: pd.DataFrame) -> SeasonRowIndex:
+    team_ids = season_rows['team_id'].to_numpy()
+    positions = np.flatnonzero(~season_rows['team_id'].duplicated(keep='last').to_numpy())
+    return SeasonRowIndex(
+        latest_positions={int(team_ids[pos]): int(pos) for pos in positions},
+        max_game_id=int(pd.to_numeric(season_rows['game_id'], errors='coerce').max()),
+        max_game_date=pd.to_datetime(season_rows['game_date'], errors='coerce').max(),
+    )
+
+
+def _season_rows_path(season: int) -> Path:
+    return season_store.season_rows_path(season, CACHED_DATA_DIR)
+
+
+def _read_season_rows(cache_path: Path) -> tuple[pd.DataFrame, SeasonRowIndex]:
+    df = season_store.read_season_rows_file(cache_path)
+    df = df.sort_values(['season', 'game_date', 'game_id', 'team_id']).reset_index(drop=True)
+    return df, _build_season_index(df)
+
+
+def _load_season_entry(season: int) -> tuple[pd.DataFrame, SeasonRowIndex]:
+    cache_path = _season_rows_path(season)
+    return _SEASON_DF_CACHE.get_or_load(int(season), lambda: _read_season_rows(cache_path), source_path=cache_path)
 
 
 def _load_cached_season_rows(season: int) -> pd.DataFrame:
-    if season not in _SEASON_DF_CACHE:
-        cache_path = CACHED_DATA_DIR / f"df_{int(season)}.csv"
-        if not cache_path.exists():
-            raise FileNotFoundError(f"Missing cached season rows: {cache_path}")
-        df = pd.read_csv(cache_path)
-        df['game_date'] = pd.to_datetime(df['game_date'], errors='coerce')
-        _SEASON_DF_CACHE[season] = df.sort_values(['season', 'game_date', 'game_id', 'team_id']).copy()
-    return _SEASON_DF_CACHE[season]
-
-
-def _load_team_id_map(season: int) -> dict[str, int]:
-    if season not in _TEAM_ID_MAP_CACHE:
-        games_path = GAME_RESULTS_DIR / f"games_{int(season)}.csv"
-        if not games_path.exists():
-            raise FileNotFoundError(f"Missing games file for team mapping: {games_path}")
-
-        mapping_df = pd.read_csv(games_path, usecols=['team_location', 'team_id']).dropna()
-        mapping_df['team_location'] = mapping_df['team_location'].replace(dp.TEAM_LOCATION_REPLACEMENTS)
-        mapping_df['team_location_key'] = mapping_df['team_location'].map(_team_key)
-        mapping_df = mapping_df.drop_duplicates(subset=['team_location_key'], keep='last')
-        _TEAM_ID_MAP_CACHE[season] = dict(zip(mapping_df['team_location_key'], mapping_df['team_id']))
-    return _TEAM_ID_MAP_CACHE[season]
-
-
-def _latest_team_row(season_rows: pd.DataFrame, team_id: int) -> pd.Series:
-    team_rows = season_rows[season_rows['team_id'] == team_id].copy()
-    if team_rows.empty:
-        raise ValueError(f"No cached rows found for team_id={team_id}")
-    team_rows = team_rows.sort_values(['game_date', 'game_id'])
-    return team_rows.iloc[-1].copy()
-
-
-def _build_synthetic_rows(
-    season_rows: pd.DataFrame,
-    team_a_id: int,
-    team_b_id: int,
-    season: int,
-    season_type: int,
-    team_a_home_away: int,
-) -> tuple[pd.DataFrame, int]:
-    latest_a = _latest_team_row(season_rows, team_a_id)
-    latest_b = _latest_team_row(season_rows, team_b_id)
+    return _load_season_entry(season)[0]
+
+
+def _load_season_index(season: int) -> SeasonRowIndex:
+    return _load_season_entry(season)[1]
+
+
+def _latest_team_rows(season: int, team_ids: Sequence[int]) -> pd.DataFrame:
+    """Each team's most recent cached row, in `team_ids` order."""
+    season_rows, season_index = _load_season_entry(season)
+    positions = []
+    for team_id in team_ids:
+        if int(team_id) not in season_index.latest_positions:
+            raise ValueError(f"No cached rows found for team_id={team_id}")
+        positions.append(season_index.latest_positions[int(team_id)])
+    return season_rows.iloc[positions].reset_index(drop=True)
+
+
+def _load_team_resolver(season: int) -> team_names.TeamResolver:
+    return team_names.load_team_resolver(season, GAME_RESULTS_DIR, CACHED_DATA_DIR)
+
+
+def _resolve_team_id(season: int, team_location: str) -> int:
+    try:
+        return _load_team_resolver(season).resolve(team_location, fuzzy=False)
+    except KeyError:
+        raise KeyError(f"Could not map team_location '{team_location}' to a team_id for {season}.") from None
+
+
+def cache_stats() -> list[dict]:
+    return [cache.stats() for cache in (_SEASON_DF_CACHE, _SEASON_STATE_CACHE, team_names._RESOLVER_CACHE)]
+
+
+def _season_matchup_state(season_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-team pair-level state as of the team's next (hypothetical) game.
 
-    synthetic_game_id = int(pd.to_numeric(season_rows['game_id'], errors='coerce').max()) + 1
-    last_game_date = pd.to_datetime(season_rows['game_date'], errors='coerce').max()
+    A synthetic game is dated after every real game, so its history-dependent
+    pair features only depend on the team's own real games: `sos` is the mean
+    opponent `net_eff_avg`, `quad_score` the sum of every game's quad score,
+    and `rank` is decided between the two teams from `rank_value`.
+    """
+    pair_rows = dp._build_pair_rows(season_rows)
+    by_team = pair_rows.groupby('team_id_a')
+    quad_score_raw = pd.Series(dp._quad_score_raw(pair_rows), index=pair_rows.index)
+
+    grid = pair_rows[['team_id_a', 'game_date', 'net_eff_avg_a']].drop_duplicates(subset=['team_id_a', 'game_date'])
+    grid = grid.sort_values(['team_id_a', 'game_date'])
+    shifted = grid.groupby('team_id_a')['net_eff_avg_a'].shift(1).ffill()
+    last_rows = grid.groupby('team_id_a').tail(1)
+    rank_value = last_rows['net_eff_avg_a'].fillna(shifted.loc[last_rows.index])
+
+    return pd.DataFrame(
+        {
+            'sos': by_team['net_eff_avg_b'].mean(),
+            'quad_score': quad_score_raw.groupby(pair_rows['team_id_a']).sum(),
+            'rank_value': pd.Series(rank_value.to_numpy(), index=last_rows['team_id_a'].to_numpy()),
+            'rank': by_team['rank_a'].last(),
+        }
+    )
+
+
+def _load_season_matchup_state(season: int) -> pd.DataFrame:
+    return _SEASON_STATE_CACHE.get_or_load(
+        int(season),
+        lambda: _season_matchup_state(_load_cached_season_rows(season)),
+        source_path=_season_rows_path(season),
+    )
+
+
+def _synthetic_rank(value: np.ndarray, other_value: np.ndarray, last_rank: np.ndarray) -> np.ndarray:
+    rank = np.where(np.isnan(other_value) | (value >= other_value), 1.0, 2.0)
+    rank = np.where(np.isnan(value), last_rank, rank)
+    return np.nan_to_num(rank, nan=0.0)
+
+
+def _build_matchup_feature_rows(
+    season: int,
+    team_a_ids: Sequence[int],
+    team_b_ids: Sequence[int],
+    season_type: int | Sequence[int],
+    team_a_home_away: int | Sequence[int],
+) -> pd.DataFrame:
+    """
+    Build the model feature rows for many hypothetical matchups at once.
+
+    Rather than appending synthetic games to the season and rebuilding its
+    pair table, each team's latest row is paired directly and the
+    history-dependent features come from the cached per-team season state,
+    so a matchup costs O(features) once the state is built. `season_type`
+    and `team_a_home_away` may be given per matchup.
+    """
+    season_index = _load_season_index(season)
+    team_a_ids = [int(team_id) for team_id in team_a_ids]
+    team_b_ids = [int(team_id) for team_id in team_b_ids]
+
+    synthetic_game_id = season_index.max_game_id + 1
+    last_game_date = season_index.max_game_date
     synthetic_game_date = (
         (last_game_date + pd.Timedelta(days=1)) if pd.notna(last_game_date) else pd.Timestamp(f"{season}-03-19")
     )
+    season_type = np.broadcast_to(np.asarray(season_type, dtype=int), (len(team_a_ids),))
+    team_a_home_away = np.broadcast_to(np.asarray(team_a_home_away, dtype=int), (len(team_a_ids),))
+    team_b_home_away = np.where(team_a_home_away == 2, 2, np.where(team_a_home_away == 1, 0, 1))
+
+    side_a = _latest_team_rows(season, team_a_ids)
+    side_b = _latest_team_rows(season, team_b_ids)
+    conference_a = side_a['short_conference_name'].to_numpy() if 'short_conference_name' in side_a else None
+    conference_b = side_b['short_conference_name'].to_numpy() if 'short_conference_name' in side_b else None
+
+    for side, home_away, opp_conference in [
+        (side_a, team_a_home_away, conference_b),
+        (side_b, team_b_home_away, conference_a),
+    ]:
+        side['game_id'] = np.arange(len(side))
+        side['season'] = int(season)
+        side['season_type'] = season_type
+        side['game_date'] = synthetic_game_date
+        side['team_home_away'] = home_away
+        if 'short_conference_name_opponent' in side.columns:
+            side['short_conference_name_opponent'] = opp_conference
 
-    team_b_home_away = 2 if int(team_a_home_away) == 2 else (0 if int(team_a_home_away) == 1 else 1)
+    pair_rows = side_a.merge(side_b, on=['game_id', 'season', 'season_type', 'game_date'], suffixes=('_a', '_b'))
+    pair_rows['game_id'] = synthetic_game_id
+    pair_rows.drop(columns=['spread_b'], inplace=True, errors='ignore')
+    pair_rows.rename(columns={'spread_a': 'spread'}, inplace=True)
 
-    row_a = latest_a.copy()
-    row_b = latest_b.copy()
+    state = _load_season_matchup_state(season)
+    state_a = state.reindex(team_a_ids)
+    state_b = state.reindex(team_b_ids)
 
-    for row, team_id, home_away, opp_conference in [
-        (row_a, team_a_id, team_a_home_away, latest_b.get('short_conference_name')),
-        (row_b, team_b_id, team_b_home_away, latest_a.get('short_conference_name')),
-    ]:
-        row['game_id'] = synthetic_game_id
-        row['season'] = int(season)
-        row['season_type'] = int(season_type)
-        row['game_date'] = synthetic_game_date
-        row['team_id'] = int(team_id)
-        row['team_home_away'] = int(home_away)
-        if 'short_conference_name_opponent' in row.index:
-            row['short_conference_name_opponent'] = opp_conference
+    pair_rows['sos'] = state_a['sos'].fillna(0).to_numpy()
+    pair_rows['sos_opp'] = state_b['sos'].fillna(0).to_numpy()
+    rank_value_a = state_a['rank_value'].to_numpy(dtype=float)
+    rank_value_b = state_b['rank_value'].to_numpy(dtype=float)
+    pair_rows['rank_a'] = _synthetic_rank(rank_value_a, rank_value_b, state_a['rank'].to_numpy(dtype=float))
+    pair_rows['rank_b'] = _synthetic_rank(rank_value_b, rank_value_a, state_b['rank'].to_numpy(dtype=float))
+
+    dp._add_pair_matchup_features(pair_rows)
+
+    pair_rows['quad_score'] = state_a['quad_score'].fillna(0).to_numpy()
+    pair_rows['games_played'] = np.minimum(pair_rows['games_played_a'], pair_rows['games_played_b'])
 
-    synthetic_rows = pd.DataFrame([row_a, row_b])
+    feature_rows = dp._flatten_pair_rows(pair_rows, drop_missing=False)
+    return feature_rows.replace([float('inf'), float('-inf')], pd.NA).fillna(0)
 
-    return synthetic_rows, synthetic_game_id
+
+def build_prediction_feature_rows(
+    matchups: Sequence[tuple[str, str, int, int]],
+    season: int,
+) -> pd.DataFrame:
+    """
+    Feature rows for many `(team_a, team_b, season_type, team_a_home_away)`
+    matchups in one pass, aligned with `matchups`.
+    """
+    team_ids = [
+        (_resolve_team_id(season, team_a_location), _resolve_team_id(season, team_b_location))
+        for team_a_location, team_b_location, _, _ in matchups
+    ]
+
+    return _build_matchup_feature_rows(
+        season,
+        [team_a_id for team_a_id, _ in team_ids],
+        [team_b_id for _, team_b_id in team_ids],
+        season_type=[int(matchup[2]) for matchup in matchups],
+        team_a_home_away=[int(matchup[3]) for matchup in matchups],
+    )
 
 
 def build_prediction_feature_row(
@@ -99,40 +237,4 @@ def build_prediction_feature_row(
     season_type: int,
     team_a_home_away: int,
 ) -> pd.DataFrame:
-    season_rows = _load_cached_season_rows(season)
-    team_id_map = _load_team_id_map(season)
-
-    team_a_key = _team_key(team_a_location)
-    team_b_key = _team_key(team_b_location)
-
-    if team_a_key not in team_id_map:
-        raise KeyError(f"Could not map team_location '{team_a_location}' to a team_id for {season}.")
-    if team_b_key not in team_id_map:
-        raise KeyError(f"Could not map team_location '{team_b_location}' to a team_id for {season}.")
-
-    team_a_id = int(team_id_map[team_a_key])
-    team_b_id = int(team_id_map[team_b_key])
-    
-    synthetic_rows, synthetic_game_id = _build_synthetic_rows(
-        season_rows,
-        team_a_id=team_a_id,
-        team_b_id=team_b_id,
-        season=season,
-        season_type=season_type,
-        team_a_home_away=team_a_home_away,
-    )
-
-    augmented_rows = pd.concat([season_rows, synthetic_rows], ignore_index=True, sort=False)
-    augmented_rows = augmented_rows.sort_values(['season', 'game_date', 'game_id', 'team_id']).reset_index(drop=True)
-
-    pair_rows = dp._build_pair_rows(augmented_rows)
-
-    synthetic_pairs = pair_rows[
-        (pair_rows['game_id'] == synthetic_game_id) & (pair_rows['team_id_a'] == team_a_id)
-    ].copy()
-   
-    if synthetic_pairs.empty:
-        raise ValueError("Synthetic matchup row could not be constructed.")
-
-    feature_row = dp._flatten_pair_rows(synthetic_pairs, drop_missing=False)
-    return feature_row.replace([float('inf'), float('-inf')], pd.NA).fillna(0)
+    return build_prediction_feature_rows([(team_a_location, team_b_location, season_type, team_a_home_away)], season)
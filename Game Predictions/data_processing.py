@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 import warnings
 
 import numpy as np
 import pandas as pd
 
+import feature_store
+import grouped_stats
+import season_store
+import stage_cache
+
 warnings.filterwarnings("ignore")
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "Data"
 GAME_RESULTS_DIR = DATA_DIR / "game_results"
 CONFERENCE_MAP_PATH = DATA_DIR / "kenpom" / "REF _ NCAAM Conference and ESPN Team Name Mapping.csv"
+ELO_STATE_DIR = DATA_DIR / "cached_data" / "elo_state"
+
+# Bump a stage's version whenever its code changes; cached outputs of that
+# stage and every later one are then recomputed.
+STAGE_VERSIONS = {
+    'team_rows': 1,
+    'pair_rows': 1,
+    'dataset_rows': 1,
+}
 
 REQUIRED_BASE_COLUMNS = [
     'team_score',
@@ -200,7 +215,8 @@ OPPONENT_DROP_COLS = [
 
 
 def load_and_prepare_dataset(dataset_path: str | Path, drop_cols: list[str] | None = None) -> pd.DataFrame:
-    df = pd.read_csv(dataset_path)
+    store = feature_store.load_feature_store(dataset_path)
+    df = store.frame() if store is not None else pd.read_csv(dataset_path)
     df = df.sort_values(by='game_date')
     if drop_cols:
         df = df.drop(columns=drop_cols, errors='ignore')
@@ -233,19 +249,91 @@ def load_conference_mapping(conference_map_path: Path | str | None = None) -> pd
     return conference_mapping[['team_location_key', 'short_conference_name']]
 
 
-def _historical_mean_by_group(series: pd.Series, group_keys) -> pd.Series:
-    return series.groupby(group_keys).transform(lambda x: x.shift(1).expanding(min_periods=1).mean())
+def _historical_mean_by_group(series: pd.Series, groups: grouped_stats.GroupIndex) -> pd.Series:
+    return grouped_stats.shifted_expanding_mean(series, groups)
 
 
-def _historical_conditional_mean(series: pd.Series, condition: pd.Series, group_keys) -> pd.Series:
+def _historical_conditional_mean(
+    series: pd.Series,
+    condition: pd.Series,
+    groups: grouped_stats.GroupIndex,
+) -> pd.Series:
     valid = condition.astype(bool) & series.notna()
-    running_total = series.where(valid, 0.0).groupby(group_keys).transform(
-        lambda x: x.shift(1).fillna(0).cumsum()
+    running = grouped_stats.shifted_cumsum(
+        pd.DataFrame({'total': series.where(valid, 0.0), 'count': valid.astype(float)}),
+        groups,
     )
-    running_count = valid.astype(float).groupby(group_keys).transform(
-        lambda x: x.shift(1).fillna(0).cumsum()
-    )
-    return running_total / running_count.replace(0, np.nan)
+    return running['total'] / running['count'].replace(0, np.nan)
+
+
+ELO_BASE_RATING = 1500.0
+ELO_K_FACTOR = 20.0
+ELO_CARRY_OVER = 0.7
+# Bump when the rating update changes so saved Elo snapshots are recomputed.
+ELO_VERSION = 1
+ELO_INPUT_COLUMNS = ['game_id', 'season', 'season_type', 'game_date', 'team_id', 'team_location', 'team_score']
+
+
+def _elo_kernel(state1, state2, actual1, carry_from, ratings, pre1, pre2):
+    """
+    Sequential Elo updates over games in order. `state1`/`state2` index each
+    game's (season, team) ratings; a state with `carry_from >= 0` starts from
+    that earlier state's final rating, regressed toward the mean.
+    """
+    started = [False] * len(ratings)
+    for g in range(len(state1)):
+        s1 = state1[g]
+        s2 = state2[g]
+        for s in (s1, s2):
+            if not started[s]:
+                started[s] = True
+                if carry_from[s] >= 0:
+                    ratings[s] = ELO_BASE_RATING + ELO_CARRY_OVER * (ratings[carry_from[s]] - ELO_BASE_RATING)
+        rating1 = ratings[s1]
+        rating2 = ratings[s2]
+        pre1[g] = rating1
+        pre2[g] = rating2
+        expected1 = 1.0 / (1.0 + 10.0 ** ((rating2 - rating1) / 400.0))
+        expected2 = 1.0 / (1.0 + 10.0 ** ((rating1 - rating2) / 400.0))
+        ratings[s1] = rating1 + ELO_K_FACTOR * (actual1[g] - expected1)
+        ratings[s2] = rating2 + ELO_K_FACTOR * ((1.0 - actual1[g]) - expected2)
+
+
+try:
+    from numba import njit
+    _elo_kernel_compiled = njit(cache=True)(_elo_kernel)
+except ImportError:
+    _elo_kernel_compiled = None
+
+
+def _run_elo_kernel(state1, state2, actual1, carry_from, ratings):
+    if _elo_kernel_compiled is not None:
+        pre1 = np.empty(len(state1))
+        pre2 = np.empty(len(state1))
+        _elo_kernel_compiled(state1, state2, actual1, carry_from, ratings, pre1, pre2)
+        return ratings, pre1, pre2
+    # Plain lists are several times faster than NumPy scalar indexing in the interpreter.
+    ratings = ratings.tolist()
+    pre1 = [0.0] * len(state1)
+    pre2 = [0.0] * len(state1)
+    _elo_kernel(state1.tolist(), state2.tolist(), actual1.tolist(), carry_from.tolist(), ratings, pre1, pre2)
+    return np.asarray(ratings), np.asarray(pre1), np.asarray(pre2)
+
+
+def _elo_game_pairs(df_merged):
+    """
+    Row positions of each game's two teams, in the order games first appear.
+    Games without exactly two distinct teams are left out.
+    """
+    keys = [df_merged['season'], df_merged['game_id']]
+    positions = pd.Series(np.arange(len(df_merged)), index=df_merged.index)
+    first_rows = ~df_merged.duplicated(['season', 'game_id', 'team_id']).to_numpy()
+    n_teams = pd.Series(first_rows, index=df_merged.index).groupby(keys, sort=False).transform('sum').to_numpy()
+    game_start = positions.groupby(keys, sort=False).transform('min').to_numpy()
+
+    selected = np.flatnonzero(first_rows & (n_teams == 2))
+    selected = selected[np.lexsort((selected, game_start[selected]))]
+    return selected[0::2], selected[1::2]
 
 
 def add_elo_ratings(df_merged, elo_ratings, elo_last_season):
@@ -257,72 +345,152 @@ def add_elo_ratings(df_merged, elo_ratings, elo_last_season):
 
     If a team does not yet have a rating for the current season, initialize it
     from that team's final Elo from the previous season when available.
+    `elo_ratings` and `elo_last_season` are read for starting ratings and
+    updated with the final ones.
     """
-    base_rating = 1500.0
-    k_factor = 20.0
-
     df_merged = df_merged.sort_values(['season', 'game_date', 'game_id', 'team_id']).copy()
-    df_merged['elo'] = base_rating
+    elo = np.full(len(df_merged), ELO_BASE_RATING)
+    rows1, rows2 = _elo_game_pairs(df_merged)
+    if len(rows1) == 0:
+        df_merged['elo'] = elo
+        return df_merged
+
+    seasons = df_merged['season'].to_numpy()[rows1].astype(np.int64)
+    team_ids = df_merged['team_id'].to_numpy()
+    score1 = df_merged['team_score'].to_numpy(dtype=float)[rows1]
+    score2 = df_merged['team_score'].to_numpy(dtype=float)[rows2]
+    actual1 = np.where(score1 > score2, 1.0, np.where(score1 < score2, 0.0, 0.5))
+
+    # One state per (season, team), numbered in order of first appearance.
+    game_teams = np.column_stack([team_ids[rows1], team_ids[rows2]]).ravel()
+    game_seasons = np.repeat(seasons, 2)
+    state_keys = pd.MultiIndex.from_arrays([game_seasons, game_teams])
+    state_codes, state_index = pd.factorize(state_keys)
+    state_seasons = state_index.get_level_values(0).to_numpy()
+    state_teams = state_index.get_level_values(1).tolist()
+
+    ratings = np.full(len(state_index), ELO_BASE_RATING)
+    carry_from = np.full(len(state_index), -1, dtype=np.int64)
+    last_state: dict = {}
+    for state, (season, team_id) in enumerate(zip(state_seasons.tolist(), state_teams)):
+        if (season, team_id) in elo_ratings:
+            ratings[state] = float(elo_ratings[(season, team_id)])
+        elif team_id in last_state:
+            carry_from[state] = last_state[team_id]
+        else:
+            prior_key = (elo_last_season.get(team_id), team_id)
+            if prior_key[0] is not None and prior_key in elo_ratings:
+                prev_elo = float(elo_ratings[prior_key])
+                ratings[state] = ELO_BASE_RATING + ELO_CARRY_OVER * (prev_elo - ELO_BASE_RATING)
+        last_state[team_id] = state
 
-    def expected_score(player_rating, opponent_rating):
-        return 1.0 / (1.0 + 10.0 ** ((opponent_rating - player_rating) / 400.0))
+    state_codes = state_codes.reshape(-1, 2)
+    ratings, pre1, pre2 = _run_elo_kernel(
+        np.ascontiguousarray(state_codes[:, 0]),
+        np.ascontiguousarray(state_codes[:, 1]),
+        actual1,
+        carry_from,
+        ratings,
+    )
+    elo[rows1] = pre1
+    elo[rows2] = pre2
+    df_merged['elo'] = elo
 
-    def get_initial_rating(team_id, season):
-        season_key = (season, team_id)
-        if season_key in elo_ratings:
-            return float(elo_ratings[season_key])
+    for season, team_id, rating in zip(state_seasons.tolist(), state_teams, ratings.tolist()):
+        elo_ratings[(season, team_id)] = rating
+        elo_last_season[team_id] = season
 
-        prior_season = elo_last_season.get(team_id)
-        if prior_season is not None:
-            prior_key = (prior_season, team_id)
-            if prior_key in elo_ratings:
-                prev_elo = float(elo_ratings[prior_key])
-                # Adjust 30% of the difference to 1500 (mean), shifting toward the mean
-                adjusted_elo = 1500 + 0.7 * (prev_elo - 1500)
-                elo_ratings[season_key] = adjusted_elo
-                return adjusted_elo
+    return df_merged
 
-        elo_ratings[season_key] = base_rating
-        return base_rating
 
-    for _, game_rows in df_merged.groupby(['season', 'game_id'], sort=False):
-        game_rows = game_rows.drop_duplicates(subset='team_id')
-        if len(game_rows) != 2:
-            continue
+def _games_file_signature(path: Path) -> list:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
 
-        idx1, idx2 = game_rows.index[0], game_rows.index[1]
-        season = int(game_rows['season'].iloc[0])
-        team1 = df_merged.at[idx1, 'team_id']
-        team2 = df_merged.at[idx2, 'team_id']
 
-        key1 = (season, team1)
-        key2 = (season, team2)
+def _season_games_signatures(max_season: int, games_dir: Path | str | None = None) -> dict[str, list]:
+    games_dir = Path(games_dir or GAME_RESULTS_DIR)
+    signatures = {}
+    for path in sorted(games_dir.glob("games_*.csv")):
+        season = int(path.stem.split("_")[1])
+        if season <= max_season:
+            signatures[str(season)] = _games_file_signature(path)
+    return signatures
 
-        rating1 = get_initial_rating(team1, season)
-        rating2 = get_initial_rating(team2, season)
 
-        df_merged.at[idx1, 'elo'] = rating1
-        df_merged.at[idx2, 'elo'] = rating2
+def _elo_state_sources(
+    season: int,
+    games_dir: Path | str | None = None,
+    conference_map_path: Path | str | None = None,
+) -> dict:
+    """Everything the ratings after `season` depend on: games files, conference map and Elo version."""
+    return {
+        'games': _season_games_signatures(season, games_dir),
+        'conference_map': _games_file_signature(Path(conference_map_path or CONFERENCE_MAP_PATH)),
+        'elo_version': ELO_VERSION,
+    }
 
-        score1 = df_merged.at[idx1, 'team_score']
-        score2 = df_merged.at[idx2, 'team_score']
 
-        if score1 > score2:
-            actual1, actual2 = 1.0, 0.0
-        elif score1 < score2:
-            actual1, actual2 = 0.0, 1.0
-        else:
-            actual1 = actual2 = 0.5
+def compact_elo_state(elo_ratings, elo_last_season) -> dict:
+    """Each team's most recent season and rating, the only part later seasons read."""
+    return {
+        str(int(team_id)): [int(season), float(elo_ratings[(season, team_id)])]
+        for team_id, season in elo_last_season.items()
+        if (season, team_id) in elo_ratings
+    }
 
-        expected1 = expected_score(rating1, rating2)
-        expected2 = expected_score(rating2, rating1)
 
-        elo_ratings[key1] = float(rating1 + k_factor * (actual1 - expected1))
-        elo_ratings[key2] = float(rating2 + k_factor * (actual2 - expected2))
-        elo_last_season[team1] = season
-        elo_last_season[team2] = season
+def expand_elo_state(state: dict) -> tuple[dict, dict]:
+    """The `(elo_ratings, elo_last_season)` dicts for a `compact_elo_state` result."""
+    elo_ratings = {}
+    elo_last_season = {}
+    for team_key, (team_season, rating) in state.items():
+        team_id = int(team_key)
+        elo_ratings[(team_season, team_id)] = rating
+        elo_last_season[team_id] = team_season
+    return elo_ratings, elo_last_season
 
-    return df_merged
+
+def save_elo_state(
+    season: int,
+    elo_ratings,
+    elo_last_season,
+    directory: Path | str | None = None,
+    games_dir: Path | str | None = None,
+    conference_map_path: Path | str | None = None,
+) -> Path:
+    """
+    Persist the ratings as they stand after `season`, together with the games
+    files, conference map and Elo version they were computed from.
+    """
+    directory = Path(directory or ELO_STATE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    state_path = directory / f"elo_state_{int(season)}.json"
+    state_path.write_text(json.dumps({
+        'sources': _elo_state_sources(season, games_dir, conference_map_path),
+        'teams': compact_elo_state(elo_ratings, elo_last_season),
+    }))
+    return state_path
+
+
+def load_elo_state(
+    season: int,
+    directory: Path | str | None = None,
+    games_dir: Path | str | None = None,
+    conference_map_path: Path | str | None = None,
+) -> tuple[dict, dict] | None:
+    """
+    `(elo_ratings, elo_last_season)` as of the end of `season`, or None when no
+    snapshot exists or any games file up to `season`, the conference map or
+    ELO_VERSION changed since it was saved.
+    """
+    state_path = Path(directory or ELO_STATE_DIR) / f"elo_state_{int(season)}.json"
+    if not state_path.exists():
+        return None
+    stored = json.loads(state_path.read_text())
+    if stored.get('sources') != _elo_state_sources(season, games_dir, conference_map_path):
+        return None
+    return expand_elo_state(stored['teams'])
 
 
 def _concat_all_seasons_games():
@@ -340,26 +508,13 @@ def _concat_all_seasons_games():
     return pd.concat(dfs, ignore_index=True, sort=False)
 
 
-def _prepare_team_game_rows(
-    games_df: pd.DataFrame,
+def _team_opponent_rows(
+    df: pd.DataFrame,
     conference_mapping: pd.DataFrame,
-    elo_ratings=None,
-    elo_last_season=None,
     *,
     keep_team_name: bool = False,
 ) -> pd.DataFrame:
-    if elo_ratings is None:
-        elo_ratings = {}
-    if elo_last_season is None:
-        elo_last_season = {}
-    if 'season' not in games_df.columns:
-        raise ValueError("games_df must have a 'season' column")
-
-    df = games_df.copy()
-    for col in REQUIRED_BASE_COLUMNS:
-        if col not in df.columns:
-            df[col] = 0
-
+    """Each team's game row joined with its opponent's, in game order. Modifies `df`."""
     df['team_location'] = df['team_location'].replace(TEAM_LOCATION_REPLACEMENTS)
 
     df['team_location_key'] = df['team_location'].astype(str).str.strip().str.lower()
@@ -377,6 +532,40 @@ def _prepare_team_game_rows(
     df_merged = df.merge(df, on=['game_id', 'season', 'season_type', 'game_date'], suffixes=(None, '_opponent'))
     df_merged = df_merged[df_merged['team_id'] != df_merged['team_id_opponent']].copy()
     df_merged.sort_values(['season', 'game_date', 'game_id', 'team_id'], inplace=True)
+    return df_merged
+
+
+def advance_elo_ratings(games_df: pd.DataFrame, conference_mapping: pd.DataFrame, elo_ratings, elo_last_season) -> None:
+    """
+    Run a season's games through the Elo updates only, leaving `elo_ratings`
+    and `elo_last_season` where a full `_prepare_team_game_rows` call would.
+    """
+    columns = [col for col in ELO_INPUT_COLUMNS if col in games_df.columns]
+    team_rows = _team_opponent_rows(games_df[columns].copy(), conference_mapping)
+    add_elo_ratings(team_rows, elo_ratings, elo_last_season)
+
+
+def _prepare_team_game_rows(
+    games_df: pd.DataFrame,
+    conference_mapping: pd.DataFrame,
+    elo_ratings=None,
+    elo_last_season=None,
+    *,
+    keep_team_name: bool = False,
+) -> pd.DataFrame:
+    if elo_ratings is None:
+        elo_ratings = {}
+    if elo_last_season is None:
+        elo_last_season = {}
+    if 'season' not in games_df.columns:
+        raise ValueError("games_df must have a 'season' column")
+
+    df = games_df.copy()
+    for col in REQUIRED_BASE_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0
+
+    df_merged = _team_opponent_rows(df, conference_mapping, keep_team_name=keep_team_name)
 
     df_merged['poss'] = (
         df_merged['field_goals_attempted']
@@ -428,21 +617,19 @@ def _prepare_team_game_rows(
         df_merged['three_point_field_goals_attempted_opponent'] / df_merged['field_goals_attempted_opponent']
     )
 
-    df_merged['three_variance'] = df_merged.groupby(['team_id', 'season'])['three_pct'].transform(
-        lambda x: x.shift(1).rolling(10, min_periods=2).std()
-    )
-    df_merged['score_variance'] = df_merged.groupby(['team_id', 'season'])['team_score'].transform(
-        lambda x: x.shift(1).rolling(10, min_periods=2).std()
-    )
-    df_merged['def_score_variance'] = df_merged.groupby(['team_id', 'season'])['opponent_team_score'].transform(
-        lambda x: x.shift(1).rolling(10, min_periods=2).std()
-    )
-    df_merged['off_eff_variance'] = df_merged.groupby(['team_id', 'season'])['off_eff'].transform(
-        lambda x: x.shift(1).rolling(10, min_periods=2).std()
-    )
-    df_merged['pace_variance'] = df_merged.groupby(['team_id', 'season'])['poss'].transform(
-        lambda x: x.shift(1).rolling(10, min_periods=2).std()
+    variance_inputs = {
+        'three_variance': 'three_pct',
+        'score_variance': 'team_score',
+        'def_score_variance': 'opponent_team_score',
+        'off_eff_variance': 'off_eff',
+        'pace_variance': 'poss',
+    }
+    team_groups = grouped_stats.group_index([df_merged['team_id'], df_merged['season']])
+    variances = grouped_stats.shifted_rolling_std(
+        df_merged[list(variance_inputs.values())], team_groups, window=10, min_periods=2
     )
+    for name, col in variance_inputs.items():
+        df_merged[name] = variances[col]
 
     df_merged['two_pm_opponent'] = (
         df_merged['field_goals_made_opponent'] - df_merged['three_point_field_goals_made_opponent']
@@ -475,18 +662,14 @@ def _prepare_team_game_rows(
     df_merged['team_winner'] = df_merged['team_winner'].apply(lambda x: 1 if x is True or x == 1 else 0)
     df_merged = add_elo_ratings(df_merged, elo_ratings, elo_last_season)
 
-    df_merged['points_last10'] = df_merged.groupby(['team_id', 'season'])['team_score'].transform(
-        lambda x: x.shift(1).ewm(alpha=alpha, min_periods=1).mean()
-    )
-    df_merged['opp_points_last10'] = df_merged.groupby(['team_id', 'season'])['opponent_team_score'].transform(
-        lambda x: x.shift(1).ewm(alpha=alpha, min_periods=1).mean()
-    )
-    df_merged['poss_last10'] = df_merged.groupby(['team_id', 'season'])['poss'].transform(
-        lambda x: x.shift(1).ewm(alpha=alpha, min_periods=1).mean()
-    )
-    df_merged['poss_opp_last10'] = df_merged.groupby(['team_id', 'season'])['poss_opponent'].transform(
-        lambda x: x.shift(1).ewm(alpha=alpha, min_periods=1).mean()
+    team_groups = grouped_stats.group_index([df_merged['team_id'], df_merged['season']])
+    recent = grouped_stats.shifted_ewm_mean(
+        df_merged[['team_score', 'opponent_team_score', 'poss', 'poss_opponent']], team_groups, alpha
     )
+    df_merged['points_last10'] = recent['team_score']
+    df_merged['opp_points_last10'] = recent['opponent_team_score']
+    df_merged['poss_last10'] = recent['poss']
+    df_merged['poss_opp_last10'] = recent['poss_opponent']
     df_merged['last_10_efficiency'] = (
         (df_merged['points_last10'] / df_merged['poss_last10'].replace(0, np.nan) * 100)
         - (df_merged['opp_points_last10'] / df_merged['poss_opp_last10'].replace(0, np.nan) * 100)
@@ -494,22 +677,19 @@ def _prepare_team_game_rows(
     df_merged.drop(['points_last10', 'opp_points_last10', 'poss_last10', 'poss_opp_last10'], axis=1, inplace=True)
     df_merged['games_played'] = df_merged.groupby(['team_id', 'season']).cumcount()
 
+    averages = grouped_stats.shifted_expanding_mean(df_merged[AVG_BASE_COLS], team_groups)
+    ewms = grouped_stats.shifted_ewm_mean(df_merged[AVG_BASE_COLS], team_groups, alpha*2)
     for col in AVG_BASE_COLS:
-        df_merged[f'{col}_avg'] = df_merged.groupby(['team_id', 'season'])[col].transform(
-            lambda x: x.shift(1).expanding(min_periods=1).mean()
-        )
-        df_merged[f'{col}_ewm'] = df_merged.groupby(['team_id', 'season'])[col].transform(
-            lambda x: x.shift(1).ewm(alpha=alpha*2, min_periods=1).mean()
-        )
+        df_merged[f'{col}_avg'] = averages[col]
+        df_merged[f'{col}_ewm'] = ewms[col]
 
     df_merged['close_game'] = df_merged['point_differential'].abs() <= 5
-    group_keys = [df_merged['team_id'], df_merged['season']]
 
     for stat in CLOSE_GAME_STATS:
         df_merged[f'{stat}_close_game_avg'] = _historical_conditional_mean(
             df_merged[stat],
             df_merged['close_game'],
-            group_keys,
+            team_groups,
         )
 
     expectation_inputs = ['poss_avg', 'poss_opponent_avg', 'off_eff_avg', 'def_eff_avg', 'efg_allowed_avg', 'orb_avg', 'drb_avg']
@@ -544,7 +724,7 @@ def _prepare_team_game_rows(
         df_merged[f'{stat}_residual'] = df_merged[stat] - expected_stat_map[stat]
         df_merged[f'{stat}_residual_avg'] = _historical_mean_by_group(
             df_merged[f'{stat}_residual'],
-            group_keys,
+            team_groups,
         )
 
     drop_avg_bases = [col for col in AVG_BASE_COLS if col not in ['team_score', 'opponent_team_score']]
@@ -555,18 +735,16 @@ def _prepare_team_game_rows(
         errors='ignore',
     )
 
-    df_merged['conference_strength'] = df_merged.groupby(['season', 'short_conference_name'])['net_eff_avg'].transform(
-        lambda x: x.shift(1).expanding(min_periods=1).mean()
+    conference_groups = grouped_stats.group_index([df_merged['season'], df_merged['short_conference_name']])
+    df_merged['conference_strength'] = grouped_stats.shifted_expanding_mean(
+        df_merged['net_eff_avg'], conference_groups
     )
     df_merged['conference_strength'].fillna(0, inplace=True)
 
     df_merged['team_winner_shifted'] = df_merged.groupby(['season', 'team_id'])['team_winner'].shift(1)
-    df_merged['wins'] = df_merged.groupby(['season', 'team_id'])['team_winner_shifted'].transform(
-        lambda x: (x == True).cumsum()
-    ).fillna(0)
-    df_merged['losses'] = df_merged.groupby(['season', 'team_id'])['team_winner_shifted'].transform(
-        lambda x: (x == False).cumsum()
-    ).fillna(0)
+    season_team_keys = [df_merged['season'], df_merged['team_id']]
+    df_merged['wins'] = (df_merged['team_winner_shifted'] == True).groupby(season_team_keys).cumsum()
+    df_merged['losses'] = (df_merged['team_winner_shifted'] == False).groupby(season_team_keys).cumsum()
 
     df_merged['non_conf_win'] = (df_merged['team_winner_shifted'].fillna(False).astype(bool)) & (
         df_merged['short_conference_name'] != df_merged['short_conference_name_opponent']
@@ -575,12 +753,8 @@ def _prepare_team_game_rows(
         df_merged['short_conference_name'] != df_merged['short_conference_name_opponent']
     )
 
-    df_merged['non_conf_wins'] = df_merged.groupby(['season', 'short_conference_name'])['non_conf_win'].transform(
-        lambda x: x.cumsum()
-    ).fillna(0)
-    df_merged['non_conf_losses'] = df_merged.groupby(['season', 'short_conference_name'])['non_conf_loss'].transform(
-        lambda x: x.cumsum()
-    ).fillna(0)
+    df_merged['non_conf_wins'] = df_merged.groupby(['season', 'short_conference_name'])['non_conf_win'].cumsum()
+    df_merged['non_conf_losses'] = df_merged.groupby(['season', 'short_conference_name'])['non_conf_loss'].cumsum()
 
     df_merged['win_loss_pct'] = df_merged['wins'] / (df_merged['wins'] + df_merged['losses'])
     df_merged['non_conf_win_loss_pct'] = df_merged['non_conf_wins'] / (
@@ -602,16 +776,16 @@ def _prepare_team_game_rows(
         inplace=True,
     )
 
-    df_merged['conference_nonconf_win_pct'] = df_merged.groupby(
-        ['season', 'short_conference_name']
-    )['non_conf_win_loss_pct'].transform(lambda x: x.shift(1).expanding(min_periods=1).mean())
+    df_merged['conference_nonconf_win_pct'] = grouped_stats.shifted_expanding_mean(
+        df_merged['non_conf_win_loss_pct'], conference_groups
+    )
     df_merged['conference_nonconf_win_pct'].fillna(0, inplace=True)
 
-    df_merged['points_for'] = df_merged.groupby(['season', 'team_id'])['team_score'].transform(
-        lambda x: x.shift(1).cumsum()
+    df_merged['points_for'] = (
+        df_merged.groupby(['season', 'team_id'])['team_score'].shift(1).groupby(season_team_keys).cumsum()
     )
-    df_merged['points_against'] = df_merged.groupby(['season', 'team_id'])['opponent_team_score'].transform(
-        lambda x: x.shift(1).cumsum()
+    df_merged['points_against'] = (
+        df_merged.groupby(['season', 'team_id'])['opponent_team_score'].shift(1).groupby(season_team_keys).cumsum()
     )
     df_merged['points_for'].fillna(0, inplace=True)
     df_merged['points_against'].fillna(0, inplace=True)
@@ -631,73 +805,11 @@ def _prepare_team_game_rows(
         errors='ignore',
     )
     season = df_merged['season'].iloc[0]
-    df_merged.to_csv(f'Data/cached_data/df_{season}.csv', index=False)
+    season_store.write_season_rows(df_merged, season)
     return df_merged
 
 
-def _build_pair_rows(team_rows: pd.DataFrame) -> pd.DataFrame:
-    pair_rows = team_rows.merge(
-        team_rows,
-        on=['game_id', 'season', 'season_type', 'game_date'],
-        suffixes=('_a', '_b'),
-    )
-    pair_rows = pair_rows[pair_rows['team_id_a'] != pair_rows['team_id_b']].copy()
-    pair_rows.sort_values(by=['season', 'game_date', 'game_id', 'team_id_a', 'team_id_b'], inplace=True)
-
-    pair_rows.drop(columns=['spread_b'], inplace=True, errors='ignore')
-    pair_rows.rename(columns={'spread_a': 'spread'}, inplace=True)
-
-    pair_rows['sos'] = pair_rows.groupby(['season', 'team_id_a'])['net_eff_avg_b'].transform(
-        lambda x: x.shift(1).expanding(min_periods=1).mean()
-    )
-    pair_rows['sos_opp'] = pair_rows.groupby(['season', 'team_id_b'])['net_eff_avg_a'].transform(
-        lambda x: x.shift(1).expanding(min_periods=1).mean()
-    )
-    pair_rows['sos'].fillna(0, inplace=True)
-    pair_rows['sos_opp'].fillna(0, inplace=True)
-
-    net_eff_a = pair_rows[['team_id_a', 'game_date', 'season', 'net_eff_avg_a']].drop_duplicates(
-        subset=['team_id_a', 'game_date', 'season']
-    )
-    net_eff_a = net_eff_a.rename(columns={'team_id_a': 'team_id'})
-    net_eff_b = pair_rows[['team_id_b', 'game_date', 'season', 'net_eff_avg_b']].drop_duplicates(
-        subset=['team_id_b', 'game_date', 'season']
-    )
-    net_eff_b = net_eff_b.rename(columns={'team_id_b': 'team_id', 'net_eff_avg_b': 'net_eff_avg'})
-
-    grid_a = net_eff_a.sort_values(['team_id', 'season', 'game_date']).copy()
-    grid_a['net_eff_avg_a'] = grid_a.groupby(['team_id', 'season'])['net_eff_avg_a'].shift(1).ffill()
-    grid_a['rank'] = grid_a.groupby(['game_date', 'season'])['net_eff_avg_a'].rank(ascending=False, method='min')
-
-    grid_b = net_eff_b.sort_values(['team_id', 'season', 'game_date']).copy()
-    grid_b['net_eff_avg'] = grid_b.groupby(['team_id', 'season'])['net_eff_avg'].shift(1).ffill()
-    grid_b['rank_opponent'] = grid_b.groupby(['game_date', 'season'])['net_eff_avg'].rank(
-        ascending=False,
-        method='min',
-    )
-
-    pair_rows = pair_rows.merge(
-        grid_a[['team_id', 'game_date', 'season', 'rank']],
-        left_on=['team_id_a', 'game_date', 'season'],
-        right_on=['team_id', 'game_date', 'season'],
-        how='left',
-    )
-    pair_rows.drop(columns=['team_id'], inplace=True)
-
-    pair_rows = pair_rows.merge(
-        grid_b[['team_id', 'game_date', 'season', 'rank_opponent']],
-        left_on=['team_id_b', 'game_date', 'season'],
-        right_on=['team_id', 'game_date', 'season'],
-        how='left',
-    )
-    pair_rows.drop(columns=['team_id'], inplace=True)
-    pair_rows.rename(columns={'rank': 'rank_a', 'rank_opponent': 'rank_b'}, inplace=True)
-    pair_rows['rank_a'] = pair_rows.groupby(['season', 'team_id_a'])['rank_a'].ffill()
-    pair_rows['rank_b'] = pair_rows.groupby(['season', 'team_id_b'])['rank_b'].ffill()
-
-    pair_rows['rank_a'] = pair_rows['rank_a'].fillna(0)
-    pair_rows['rank_b'] = pair_rows['rank_b'].fillna(0)
-
+def _add_pair_matchup_features(pair_rows: pd.DataFrame) -> pd.DataFrame:
     pair_rows['threes_advantage'] = (
         pair_rows['three_attempt_rate_avg_a'] * pair_rows['three_pct_avg_a']
     ) - (
@@ -737,7 +849,10 @@ def _build_pair_rows(team_rows: pd.DataFrame) -> pd.DataFrame:
     pair_rows['margin_estimate'] = (
         (pair_rows['net_eff_avg_a'] - pair_rows['net_eff_avg_b']) * pair_rows['exp_poss']
     ) / 100
+    return pair_rows
+
 
+def _quad_score_raw(pair_rows: pd.DataFrame) -> np.ndarray:
     rank_b = pd.to_numeric(pair_rows['rank_b'], errors='coerce')
     location = pair_rows['team_home_away_a']
     quad_1 = (
@@ -763,10 +878,77 @@ def _build_pair_rows(team_rows: pd.DataFrame) -> pd.DataFrame:
 
     quad_win_score = np.select([quad_1, quad_2, quad_3, quad_4], [4, 3, 2, 1], default=0)
     quad_loss_score = np.select([quad_1, quad_2, quad_3, quad_4], [-1, -2, -3, -4], default=0)
-    pair_rows['quad_score_raw'] = np.where(pair_rows['team_winner_a'] == 1, quad_win_score, quad_loss_score)
-    pair_rows['quad_score'] = (
-        pair_rows.groupby(['season', 'team_id_a'])['quad_score_raw']
-        .transform(lambda x: x.shift(1).fillna(0).cumsum())
+    return np.where(pair_rows['team_winner_a'] == 1, quad_win_score, quad_loss_score)
+
+
+def _build_pair_rows(team_rows: pd.DataFrame) -> pd.DataFrame:
+    pair_rows = team_rows.merge(
+        team_rows,
+        on=['game_id', 'season', 'season_type', 'game_date'],
+        suffixes=('_a', '_b'),
+    )
+    pair_rows = pair_rows[pair_rows['team_id_a'] != pair_rows['team_id_b']].copy()
+    pair_rows.sort_values(by=['season', 'game_date', 'game_id', 'team_id_a', 'team_id_b'], inplace=True)
+
+    pair_rows.drop(columns=['spread_b'], inplace=True, errors='ignore')
+    pair_rows.rename(columns={'spread_a': 'spread'}, inplace=True)
+
+    pair_rows['sos'] = grouped_stats.shifted_expanding_mean(
+        pair_rows['net_eff_avg_b'], grouped_stats.group_index([pair_rows['season'], pair_rows['team_id_a']])
+    )
+    pair_rows['sos_opp'] = grouped_stats.shifted_expanding_mean(
+        pair_rows['net_eff_avg_a'], grouped_stats.group_index([pair_rows['season'], pair_rows['team_id_b']])
+    )
+    pair_rows['sos'].fillna(0, inplace=True)
+    pair_rows['sos_opp'].fillna(0, inplace=True)
+
+    net_eff_a = pair_rows[['team_id_a', 'game_date', 'season', 'net_eff_avg_a']].drop_duplicates(
+        subset=['team_id_a', 'game_date', 'season']
+    )
+    net_eff_a = net_eff_a.rename(columns={'team_id_a': 'team_id'})
+    net_eff_b = pair_rows[['team_id_b', 'game_date', 'season', 'net_eff_avg_b']].drop_duplicates(
+        subset=['team_id_b', 'game_date', 'season']
+    )
+    net_eff_b = net_eff_b.rename(columns={'team_id_b': 'team_id', 'net_eff_avg_b': 'net_eff_avg'})
+
+    grid_a = net_eff_a.sort_values(['team_id', 'season', 'game_date']).copy()
+    grid_a['net_eff_avg_a'] = grid_a.groupby(['team_id', 'season'])['net_eff_avg_a'].shift(1).ffill()
+    grid_a['rank'] = grid_a.groupby(['game_date', 'season'])['net_eff_avg_a'].rank(ascending=False, method='min')
+
+    grid_b = net_eff_b.sort_values(['team_id', 'season', 'game_date']).copy()
+    grid_b['net_eff_avg'] = grid_b.groupby(['team_id', 'season'])['net_eff_avg'].shift(1).ffill()
+    grid_b['rank_opponent'] = grid_b.groupby(['game_date', 'season'])['net_eff_avg'].rank(
+        ascending=False,
+        method='min',
+    )
+
+    pair_rows = pair_rows.merge(
+        grid_a[['team_id', 'game_date', 'season', 'rank']],
+        left_on=['team_id_a', 'game_date', 'season'],
+        right_on=['team_id', 'game_date', 'season'],
+        how='left',
+    )
+    pair_rows.drop(columns=['team_id'], inplace=True)
+
+    pair_rows = pair_rows.merge(
+        grid_b[['team_id', 'game_date', 'season', 'rank_opponent']],
+        left_on=['team_id_b', 'game_date', 'season'],
+        right_on=['team_id', 'game_date', 'season'],
+        how='left',
+    )
+    pair_rows.drop(columns=['team_id'], inplace=True)
+    pair_rows.rename(columns={'rank': 'rank_a', 'rank_opponent': 'rank_b'}, inplace=True)
+    pair_rows['rank_a'] = pair_rows.groupby(['season', 'team_id_a'])['rank_a'].ffill()
+    pair_rows['rank_b'] = pair_rows.groupby(['season', 'team_id_b'])['rank_b'].ffill()
+
+    pair_rows['rank_a'] = pair_rows['rank_a'].fillna(0)
+    pair_rows['rank_b'] = pair_rows['rank_b'].fillna(0)
+
+    _add_pair_matchup_features(pair_rows)
+
+    pair_rows['quad_score_raw'] = _quad_score_raw(pair_rows)
+    pair_rows['quad_score'] = grouped_stats.shifted_cumsum(
+        pair_rows['quad_score_raw'], grouped_stats.group_index([pair_rows['season'], pair_rows['team_id_a']])
     )
     pair_rows.drop(columns=['quad_score_raw'], inplace=True)
     pair_rows['quad_score'] = pair_rows.groupby(['season', 'team_id_a'])['quad_score'].ffill().fillna(0)
@@ -838,22 +1020,76 @@ def _attach_matchup_context(team_rows: pd.DataFrame) -> pd.DataFrame:
     )
 
 
+def _has_season_rows(season: int) -> bool:
+    try:
+        season_store.season_rows_path(season)
+    except FileNotFoundError:
+        return False
+    return True
+
+
 def process_all_games(
     games_df: pd.DataFrame,
     conference_mapping: pd.DataFrame,
     elo_ratings=None,
     elo_last_season=None,
+    *,
+    cache: stage_cache.StageCache | None = None,
 ) -> pd.DataFrame:
-    print("Calculating game-level features...")
-    team_rows = _prepare_team_game_rows(
-        games_df,
-        conference_mapping,
-        elo_ratings=elo_ratings,
-        elo_last_season=elo_last_season,
-    )
-    print("Getting matchup features...")
-    pair_rows = _build_pair_rows(team_rows)
-    return _flatten_pair_rows(pair_rows, drop_missing=True)
+    """
+    Dataset rows for `games_df`. Each stage's output is cached under a hash of
+    the games, the conference map, the starting Elo state and the stage
+    versions, so unchanged inputs skip straight to the first stage that
+    changed. Elo ratings are advanced either way.
+    """
+    if elo_ratings is None:
+        elo_ratings = {}
+    if elo_last_season is None:
+        elo_last_season = {}
+    cache = cache or stage_cache.StageCache()
+    seasons = sorted(int(season) for season in games_df['season'].dropna().unique())
+    slot = "-".join(str(season) for season in seasons)
+
+    team_key = stage_cache.stage_key(
+        'team_rows',
+        STAGE_VERSIONS['team_rows'],
+        stage_cache.frame_digest(games_df),
+        stage_cache.frame_digest(conference_mapping),
+        compact_elo_state(elo_ratings, elo_last_season),
+    )
+    pair_key = stage_cache.stage_key('pair_rows', STAGE_VERSIONS['pair_rows'], team_key)
+    dataset_key = stage_cache.stage_key('dataset_rows', STAGE_VERSIONS['dataset_rows'], pair_key)
+
+    # The cached season rows are written with the team rows; rebuild from there if they are missing.
+    rows_stored = all(_has_season_rows(season) for season in seasons)
+    dataset_rows = cache.load('dataset_rows', slot, dataset_key) if rows_stored else None
+    pair_rows = None
+    if dataset_rows is None and rows_stored:
+        pair_rows = cache.load('pair_rows', slot, pair_key)
+
+    if dataset_rows is None and pair_rows is None:
+        team_rows = cache.load('team_rows', slot, team_key)
+        if team_rows is None:
+            print("Calculating game-level features...")
+            team_rows = _prepare_team_game_rows(
+                games_df,
+                conference_mapping,
+                elo_ratings=elo_ratings,
+                elo_last_season=elo_last_season,
+            )
+            cache.store('team_rows', slot, team_key, team_rows)
+        else:
+            advance_elo_ratings(games_df, conference_mapping, elo_ratings, elo_last_season)
+            if not rows_stored:
+                season_store.write_season_rows(team_rows, team_rows['season'].iloc[0])
+        print("Getting matchup features...")
+        pair_rows = cache.store('pair_rows', slot, pair_key, _build_pair_rows(team_rows))
+    else:
+        advance_elo_ratings(games_df, conference_mapping, elo_ratings, elo_last_season)
+
+    if dataset_rows is None:
+        dataset_rows = cache.store('dataset_rows', slot, dataset_key, _flatten_pair_rows(pair_rows, drop_missing=True))
+    return dataset_rows
 
 
 def build_team_feature_rows(season: int, conference_mapping: pd.DataFrame) -> pd.DataFrame:
@@ -861,12 +1097,28 @@ def build_team_feature_rows(season: int, conference_mapping: pd.DataFrame) -> pd
     Return the per-team pre-game rows that feed `process_all_games`, plus the
     team-side matchup context needed to mirror final matchup features later.
     """
-    df_all = _concat_all_seasons_games()
-    df = df_all[df_all['season'] <= season].copy()
+    # Elo is the only state carried between seasons, so with a snapshot of the
+    # previous season only this season's games need to be processed.
+    prior_state = load_elo_state(season - 1)
+    games_path = GAME_RESULTS_DIR / f"games_{int(season)}.csv"
+    if prior_state is not None and games_path.exists():
+        elo_ratings, elo_last_season = prior_state
+        df = pd.read_csv(games_path)
+        df['season'] = int(season)
+    else:
+        elo_ratings, elo_last_season = {}, {}
+        df_all = _concat_all_seasons_games()
+        df = df_all[df_all['season'] <= season].copy()
     if df.empty:
         return df
 
-    team_rows = _prepare_team_game_rows(df, conference_mapping, keep_team_name=True)
+    team_rows = _prepare_team_game_rows(
+        df,
+        conference_mapping,
+        elo_ratings=elo_ratings,
+        elo_last_season=elo_last_season,
+        keep_team_name=True,
+    )
     team_rows = _attach_matchup_context(team_rows)
     team_rows.sort_values(by=['game_date', 'game_id', 'team_id'], inplace=True)
     return team_rows[team_rows['season'] == season].copy()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+GAME_PRED_DIR = Path(__file__).resolve().parent
+DATASET_PATH = GAME_PRED_DIR / "dataset.csv"
+FEATURE_STORE_DIR = GAME_PRED_DIR / "feature_store"
+
+_KEY_COLUMN = 'game_id'
+_DATE_COLUMN = 'game_date'
+_READ_CHUNK_ROWS = 200_000
+
+
+def _source_signature(dataset_path: Path) -> dict:
+    stat = dataset_path.stat()
+    return {'path': str(dataset_path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _count_rows(dataset_path: Path) -> int:
+    return sum(len(chunk) for chunk in pd.read_csv(dataset_path, usecols=[0], chunksize=_READ_CHUNK_ROWS))
+
+
+def _default_store_dir(dataset_path: Path) -> Path:
+    return dataset_path.parent / FEATURE_STORE_DIR.name
+
+
+def build_feature_store(
+    dataset_path: Path | str = DATASET_PATH,
+    store_dir: Path | str | None = None,
+) -> Path:
+    """
+    Convert `dataset.csv` into a memory-mappable store: numeric columns as one
+    row-major float32 `features.npy`, game ids and dates in their own arrays,
+    and a `manifest.json` naming the columns. Text columns are not stored.
+    """
+    dataset_path = Path(dataset_path)
+    store_dir = Path(store_dir) if store_dir is not None else _default_store_dir(dataset_path)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    header = pd.read_csv(dataset_path, nrows=1000)
+    feature_columns = [
+        col for col in header.columns
+        if col not in (_KEY_COLUMN, _DATE_COLUMN)
+        and (pd.api.types.is_numeric_dtype(header[col]) or pd.api.types.is_bool_dtype(header[col]))
+    ]
+    integer_columns = {col for col in feature_columns if pd.api.types.is_integer_dtype(header[col])}
+    n_rows = _count_rows(dataset_path)
+
+    features = np.lib.format.open_memmap(
+        store_dir / "features.npy", mode='w+', dtype=np.float32, shape=(n_rows, len(feature_columns))
+    )
+    game_ids = np.zeros(n_rows, dtype=np.int64)
+    game_dates = np.full(n_rows, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    start = 0
+    for chunk in pd.read_csv(dataset_path, chunksize=_READ_CHUNK_ROWS):
+        stop = start + len(chunk)
+        values = chunk.reindex(columns=feature_columns).apply(pd.to_numeric, errors='coerce')
+        integer_columns &= {col for col in integer_columns if pd.api.types.is_integer_dtype(values[col])}
+        features[start:stop] = values.to_numpy(dtype=np.float32)
+        if _KEY_COLUMN in chunk.columns:
+            game_ids[start:stop] = pd.to_numeric(chunk[_KEY_COLUMN], errors='coerce').fillna(0).to_numpy(np.int64)
+        if _DATE_COLUMN in chunk.columns:
+            game_dates[start:stop] = pd.to_datetime(chunk[_DATE_COLUMN], errors='coerce').to_numpy('datetime64[ns]')
+        start = stop
+    features.flush()
+    np.save(store_dir / "game_ids.npy", game_ids)
+    np.save(store_dir / "game_dates.npy", game_dates)
+
+    manifest = {
+        'columns': feature_columns,
+        'integer_columns': [col for col in feature_columns if col in integer_columns],
+        'n_rows': n_rows,
+        'source': _source_signature(dataset_path),
+    }
+    manifest_path = store_dir / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest_path
+
+
+class FeatureStore:
+    """
+    Read-only view of a store written by `build_feature_store`. `features`
+    is memory-mapped, so row and column slices are read lazily from disk.
+    """
+
+    def __init__(self, store_dir: Path | str = FEATURE_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        manifest_path = self.store_dir / "manifest.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Missing feature store manifest: {manifest_path}")
+        self.manifest = json.loads(manifest_path.read_text())
+        self.columns: list[str] = self.manifest['columns']
+        self.column_index = {col: idx for idx, col in enumerate(self.columns)}
+        self.features = np.load(self.store_dir / "features.npy", mmap_mode='r')
+        self.game_ids = np.load(self.store_dir / "game_ids.npy", mmap_mode='r')
+        self.game_dates = np.load(self.store_dir / "game_dates.npy", mmap_mode='r')
+
+    def __len__(self) -> int:
+        return self.features.shape[0]
+
+    def is_current(self, dataset_path: Path | str = DATASET_PATH) -> bool:
+        """Whether the store was built from `dataset_path` as it is now."""
+        dataset_path = Path(dataset_path)
+        return dataset_path.exists() and self.manifest['source'] == _source_signature(dataset_path)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.features[:, self.column_index[name]]
+
+    def matrix(self, columns: Sequence[str] | None = None, rows=slice(None)) -> np.ndarray:
+        """A float32 block of `rows` x `columns`; a view when only rows are sliced."""
+        if columns is None:
+            return self.features[rows]
+        return self.features[rows][:, [self.column_index[col] for col in columns]]
+
+    def frame(self, columns: Sequence[str] | None = None, rows=slice(None)) -> pd.DataFrame:
+        """
+        The rows as a DataFrame shaped like `dataset.csv`: `game_id` and
+        `game_date` first, integer columns restored to int64.
+        """
+        block = self.matrix(columns, rows)
+        columns = list(self.columns if columns is None else columns)
+        df = pd.DataFrame(block, columns=columns, copy=False)
+        for col in self.manifest['integer_columns']:
+            if col in df.columns:
+                df[col] = df[col].astype(np.int64)
+        df.insert(0, _DATE_COLUMN, np.asarray(self.game_dates[rows]))
+        df.insert(0, _KEY_COLUMN, np.asarray(self.game_ids[rows]))
+        return df
+
+
+def load_feature_store(
+    dataset_path: Path | str = DATASET_PATH,
+    store_dir: Path | str | None = None,
+) -> FeatureStore | None:
+    """The store for `dataset_path` if one was built from its current contents."""
+    dataset_path = Path(dataset_path)
+    try:
+        store = FeatureStore(store_dir if store_dir is not None else _default_store_dir(dataset_path))
+    except FileNotFoundError:
+        return None
+    return store if store.is_current(dataset_path) else None
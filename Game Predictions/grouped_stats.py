@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class GroupIndex:
+    """
+    Rows grouped by key, each group kept in frame order. `steps[t]` holds the
+    rows that are the t-th of their group, so a kernel walks every group at
+    once, one position at a time. Rows with a missing key have code -1.
+    """
+
+    codes: np.ndarray
+    n_groups: int
+    sorted_rows: np.ndarray
+    ranks: np.ndarray
+    steps: list[np.ndarray]
+
+    def lag_rows(self, rows: np.ndarray, lag: int) -> np.ndarray:
+        """The rows `lag` positions earlier in the same groups as `rows`."""
+        return self.sorted_rows[self.ranks[rows] - lag]
+
+
+def group_index(keys: Sequence) -> GroupIndex:
+    """Index rows by the combination of `keys` (Series or arrays of equal length)."""
+    n_rows = len(keys[0])
+    codes = np.zeros(n_rows, dtype=np.int64)
+    for key in keys:
+        key_codes, uniques = pd.factorize(np.asarray(key))
+        codes = np.where((codes < 0) | (key_codes < 0), -1, codes * max(len(uniques), 1) + key_codes)
+
+    valid = codes >= 0
+    uniques, codes[valid] = np.unique(codes[valid], return_inverse=True)
+    valid_rows = np.flatnonzero(valid)
+    sorted_rows = valid_rows[np.argsort(codes[valid_rows], kind='stable')]
+
+    sorted_codes = codes[sorted_rows]
+    offsets = np.arange(len(sorted_rows))
+    group_starts = np.maximum.accumulate(
+        np.where(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]], offsets, 0)
+    ) if len(sorted_rows) else offsets
+    positions = offsets - group_starts
+    ranks = np.full(n_rows, -1, dtype=np.int64)
+    ranks[sorted_rows] = offsets
+
+    by_position = sorted_rows[np.argsort(positions, kind='stable')]
+    counts = np.bincount(positions) if len(positions) else np.zeros(0, dtype=np.int64)
+    steps = np.split(by_position, np.cumsum(counts)[:-1]) if len(counts) else []
+    return GroupIndex(codes, len(uniques), sorted_rows, ranks, steps)
+
+
+def _as_matrix(values: pd.DataFrame | pd.Series) -> np.ndarray:
+    matrix = values.to_numpy(dtype=np.float64)
+    return matrix.reshape(len(values), -1)
+
+
+def _as_result(values: pd.DataFrame | pd.Series, out: np.ndarray) -> pd.DataFrame | pd.Series:
+    if isinstance(values, pd.Series):
+        return pd.Series(out[:, 0], index=values.index, name=values.name)
+    return pd.DataFrame(out, index=values.index, columns=values.columns)
+
+
+def shifted_expanding_mean(
+    values: pd.DataFrame | pd.Series,
+    index: GroupIndex,
+    min_periods: int = 1,
+) -> pd.DataFrame | pd.Series:
+    """
+    `groupby(keys)[col].transform(lambda x: x.shift(1).expanding(min_periods).mean())`
+    for every column at once, with pandas' compensated summation.
+    """
+    data = _as_matrix(values)
+    out = np.full(data.shape, np.nan)
+    shape = (index.n_groups, data.shape[1])
+    sum_x = np.zeros(shape)
+    compensation = np.zeros(shape)
+    nobs = np.zeros(shape, dtype=np.int64)
+    neg_ct = np.zeros(shape, dtype=np.int64)
+    same_ct = np.zeros(shape, dtype=np.int64)
+    prev_value = np.full(shape, np.nan)
+
+    for step, rows in enumerate(index.steps):
+        groups = index.codes[rows]
+        if step:
+            value = data[index.lag_rows(rows, 1)]
+            observed = ~np.isnan(value)
+            y = value - compensation[groups]
+            total = sum_x[groups] + y
+            compensation[groups] = np.where(observed, total - sum_x[groups] - y, compensation[groups])
+            sum_x[groups] = np.where(observed, total, sum_x[groups])
+            nobs[groups] += observed
+            neg_ct[groups] += observed & np.signbit(value)
+            same_ct[groups] = np.where(
+                observed, np.where(value == prev_value[groups], same_ct[groups] + 1, 1), same_ct[groups]
+            )
+            prev_value[groups] = np.where(observed, value, prev_value[groups])
+
+        count = nobs[groups]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sum_x[groups] / count
+        negatives = neg_ct[groups]
+        mean = np.where(
+            same_ct[groups] >= count,
+            prev_value[groups],
+            np.where(((negatives == 0) & (mean < 0)) | ((negatives == count) & (mean > 0)), 0.0, mean),
+        )
+        out[rows] = np.where((count >= min_periods) & (count > 0), mean, np.nan)
+    return _as_result(values, out)
+
+
+def shifted_ewm_mean(
+    values: pd.DataFrame | pd.Series,
+    index: GroupIndex,
+    alpha: float,
+    min_periods: int = 1,
+) -> pd.DataFrame | pd.Series:
+    """
+    `groupby(keys)[col].transform(lambda x: x.shift(1).ewm(alpha=alpha, min_periods=min_periods).mean())`
+    (adjust=True, ignore_na=False) for every column at once.
+    """
+    data = _as_matrix(values)
+    out = np.full(data.shape, np.nan)
+    # pandas converts alpha to a center of mass and back.
+    alpha = 1.0 / (1.0 + (1.0 - alpha) / alpha)
+    old_wt_factor = 1.0 - alpha
+    min_periods = max(int(min_periods), 1)
+    shape = (index.n_groups, data.shape[1])
+    weighted = np.full(shape, np.nan)
+    old_wt = np.ones(shape)
+    nobs = np.zeros(shape, dtype=np.int64)
+
+    for step, rows in enumerate(index.steps):
+        groups = index.codes[rows]
+        if step:
+            value = data[index.lag_rows(rows, 1)]
+            observed = ~np.isnan(value)
+            current = weighted[groups]
+            started = ~np.isnan(current)
+            weight = np.where(started, old_wt[groups] * old_wt_factor, old_wt[groups])
+            blended = (weight * current + value) / (weight + 1.0)
+            current = np.where(
+                started & observed & (current != value),
+                blended,
+                np.where(~started & observed, value, current),
+            )
+            weighted[groups] = current
+            old_wt[groups] = np.where(started & observed, weight + 1.0, weight)
+            nobs[groups] += observed
+        out[rows] = np.where(nobs[groups] >= min_periods, weighted[groups], np.nan)
+    return _as_result(values, out)
+
+
+def shifted_rolling_std(
+    values: pd.DataFrame | pd.Series,
+    index: GroupIndex,
+    window: int,
+    min_periods: int | None = None,
+    ddof: int = 1,
+) -> pd.DataFrame | pd.Series:
+    """
+    `groupby(keys)[col].transform(lambda x: x.shift(1).rolling(window, min_periods).std())`
+    for every column at once, using pandas' online variance updates.
+    """
+    data = _as_matrix(values)
+    out = np.full(data.shape, np.nan)
+    min_periods = max(window if min_periods is None else int(min_periods), 1)
+    shape = (index.n_groups, data.shape[1])
+    mean_x = np.zeros(shape)
+    ssqdm_x = np.zeros(shape)
+    nobs = np.zeros(shape, dtype=np.int64)
+    compensation_add = np.zeros(shape)
+    compensation_remove = np.zeros(shape)
+    same_ct = np.zeros(shape, dtype=np.int64)
+    prev_value = np.full(shape, np.nan)
+
+    for step, rows in enumerate(index.steps):
+        groups = index.codes[rows]
+        if step > window:
+            value = data[index.lag_rows(rows, window + 1)]
+            observed = ~np.isnan(value)
+            count = nobs[groups] - observed
+            mean = mean_x[groups]
+            prev_mean = mean - compensation_remove[groups]
+            y = value - compensation_remove[groups]
+            t = y - mean
+            with np.errstate(invalid='ignore', divide='ignore'):
+                new_mean = mean - t / count
+            new_ssqdm = ssqdm_x[groups] - (value - prev_mean) * (value - new_mean)
+            keep = observed & (count > 0)
+            emptied = observed & (count == 0)
+            compensation_remove[groups] = np.where(keep, t + mean - y, compensation_remove[groups])
+            mean_x[groups] = np.where(keep, new_mean, np.where(emptied, 0.0, mean))
+            ssqdm_x[groups] = np.where(keep, new_ssqdm, np.where(emptied, 0.0, ssqdm_x[groups]))
+            nobs[groups] = count
+        if step:
+            value = data[index.lag_rows(rows, 1)]
+            observed = ~np.isnan(value)
+            count = nobs[groups] + observed
+            same_ct[groups] = np.where(
+                observed, np.where(value == prev_value[groups], same_ct[groups] + 1, 1), same_ct[groups]
+            )
+            prev_value[groups] = np.where(observed, value, prev_value[groups])
+            mean = mean_x[groups]
+            prev_mean = mean - compensation_add[groups]
+            y = value - compensation_add[groups]
+            t = y - mean
+            with np.errstate(invalid='ignore', divide='ignore'):
+                new_mean = mean + t / count
+            compensation_add[groups] = np.where(observed, t + mean - y, compensation_add[groups])
+            ssqdm_x[groups] = np.where(
+                observed, ssqdm_x[groups] + (value - prev_mean) * (value - new_mean), ssqdm_x[groups]
+            )
+            mean_x[groups] = np.where(observed, new_mean, mean)
+            nobs[groups] = count
+
+        count = nobs[groups]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.maximum(ssqdm_x[groups] / (count - ddof), 0.0)
+        variance = np.where((count == 1) | (same_ct[groups] >= count), 0.0, variance)
+        out[rows] = np.where((count >= min_periods) & (count > ddof), np.sqrt(variance), np.nan)
+    return _as_result(values, out)
+
+
+def shifted_cumsum(values: pd.DataFrame | pd.Series, index: GroupIndex) -> pd.DataFrame | pd.Series:
+    """`groupby(keys)[col].transform(lambda x: x.shift(1).fillna(0).cumsum())` for every column at once."""
+    data = _as_matrix(values)
+    out = np.full(data.shape, np.nan)
+    total = np.zeros((index.n_groups, data.shape[1]))
+    for step, rows in enumerate(index.steps):
+        groups = index.codes[rows]
+        if step:
+            value = data[index.lag_rows(rows, 1)]
+            total[groups] = total[groups] + np.where(np.isnan(value), 0.0, value)
+        out[rows] = total[groups]
+    return _as_result(values, out)
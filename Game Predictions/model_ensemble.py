@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
 
-import joblib
 import numpy as np
 import pandas as pd
 
 import data_processing as dp
 
 META_FEATURE_COLUMNS = ['winner_model_proba', 'spread_model_pred']
+NATIVE_MODEL_DIRNAME = "native"
+JOBLIB_MODEL_FILES = {
+    "winner": "lgbm_winner_model.joblib",
+    "spread": "lgbm_spread_model.joblib",
+    "meta": "meta_model.joblib",
+}
 
 _MODEL_CACHE = None
+# Fingerprint -> the model entries it was computed for, see `trusted_fingerprint`.
+_FINGERPRINTED_MODELS: dict[str, tuple] = {}
 
 
 def _resolve_model_dir(model_dir: Path | str | None) -> Path:
@@ -27,15 +36,199 @@ def _get_feature_names(model) -> list[str]:
     raise ValueError("Unable to infer feature names from model.")
 
 
-def load_models(model_dir: Path | str | None = None) -> dict:
+def _files_fingerprint(paths) -> str:
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def _joblib_model_files(model_path: Path) -> list[Path]:
+    return [model_path / JOBLIB_MODEL_FILES[name] for name in ("winner", "spread", "meta")]
+
+
+class NativeBoosterModel:
+    """
+    A LightGBM booster saved as a native text model, loaded on first use and
+    exposing the sklearn `predict_proba`/`predict` calls the ensemble makes.
+    """
+
+    def __init__(self, model_file: Path | str):
+        self.model_file = Path(model_file)
+        self._booster = None
+
+    @property
+    def booster(self):
+        if self._booster is None:
+            import lightgbm as lgb
+
+            self._booster = lgb.Booster(model_file=str(self.model_file))
+        return self._booster
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(self.booster.predict(X), dtype=float)
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = self.predict(X)
+        return np.column_stack([1.0 - positive, positive])
+
+
+class LogisticMetaModel:
+    """The standardized logistic-regression meta model, from exported coefficients."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, coef: np.ndarray, intercept: float):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+
+    def predict_proba(self, X) -> np.ndarray:
+        z = (np.asarray(X, dtype=float) - self.mean) / self.scale
+        positive = 1.0 / (1.0 + np.exp(-(z @ self.coef + self.intercept)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _meta_model_params(meta_model) -> dict:
+    steps = list(meta_model.named_steps.values()) if hasattr(meta_model, "named_steps") else [meta_model]
+    n_features = len(META_FEATURE_COLUMNS)
+    mean, scale = np.zeros(n_features), np.ones(n_features)
+    if len(steps) == 2 and hasattr(steps[0], "mean_") and hasattr(steps[0], "scale_"):
+        mean, scale = steps[0].mean_, steps[0].scale_
+    elif len(steps) != 1:
+        raise ValueError("Only a logistic regression, optionally after a StandardScaler, can be exported.")
+    logistic = steps[-1]
+    if not hasattr(logistic, "coef_") or logistic.coef_.shape[0] != 1:
+        raise ValueError("The meta model must be a binary logistic regression to be exported.")
+    return {
+        "mean": [float(value) for value in mean],
+        "scale": [float(value) for value in scale],
+        "coef": [float(value) for value in logistic.coef_[0]],
+        "intercept": float(logistic.intercept_[0]),
+    }
+
+
+def export_native_models(model_dir: Path | str | None = None, out_dir: Path | str | None = None) -> Path:
+    """
+    Write the joblib models as native LightGBM text boosters plus the meta
+    model's coefficients and a manifest of each model's features.
+    """
+    import joblib
+
+    model_path = _resolve_model_dir(model_dir)
+    out_path = Path(out_dir) if out_dir is not None else model_path / NATIVE_MODEL_DIRNAME
+    out_path.mkdir(parents=True, exist_ok=True)
+
+    winner_model = joblib.load(model_path / JOBLIB_MODEL_FILES["winner"])
+    spread_model = joblib.load(model_path / JOBLIB_MODEL_FILES["spread"])
+    meta_model = joblib.load(model_path / JOBLIB_MODEL_FILES["meta"])
+
+    winner_model.booster_.save_model(str(out_path / "winner_model.txt"))
+    spread_model.booster_.save_model(str(out_path / "spread_model.txt"))
+    (out_path / "meta_model.json").write_text(json.dumps(_meta_model_params(meta_model), indent=2))
+
+    manifest = {
+        "source_fingerprint": _files_fingerprint(_joblib_model_files(model_path)),
+        "winner": {"file": "winner_model.txt", "features": _get_feature_names(winner_model)},
+        "spread": {"file": "spread_model.txt", "features": _get_feature_names(spread_model)},
+        "meta": {"file": "meta_model.json", "features": META_FEATURE_COLUMNS},
+    }
+    manifest["fingerprint"] = _files_fingerprint(
+        out_path / manifest[name]["file"] for name in ("winner", "spread", "meta")
+    )
+    manifest_path = out_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest_path
+
+
+def _native_models_current(native_path: Path, model_path: Path) -> bool:
+    """
+    Whether the native export was made from the joblib models now on disk.
+    Without joblib files to compare against, the export is all there is.
+    """
+    model_files = _joblib_model_files(model_path)
+    if not all(path.exists() for path in model_files):
+        return True
+    manifest = json.loads((native_path / "manifest.json").read_text())
+    return manifest.get("source_fingerprint") == _files_fingerprint(model_files)
+
+
+def _load_native_models(native_path: Path) -> dict:
+    manifest = json.loads((native_path / "manifest.json").read_text())
+    meta_params = json.loads((native_path / manifest["meta"]["file"]).read_text())
+    return {
+        "winner": {
+            "model": NativeBoosterModel(native_path / manifest["winner"]["file"]),
+            "features": manifest["winner"]["features"],
+        },
+        "spread": {
+            "model": NativeBoosterModel(native_path / manifest["spread"]["file"]),
+            "features": manifest["spread"]["features"],
+        },
+        "meta": {
+            "model": LogisticMetaModel(**meta_params),
+            "features": manifest["meta"]["features"],
+        },
+        "fingerprint": manifest["fingerprint"],
+    }
+
+
+def bundle_models(model_bundle: dict) -> tuple:
+    """The bundle's model objects and feature lists, in a fixed order."""
+    return tuple(
+        (name, entry.get("model"), tuple(entry.get("features") or ()))
+        for name, entry in sorted((k, v) for k, v in model_bundle.items() if isinstance(v, dict))
+    )
+
+
+def _same_models(first: tuple, second: tuple) -> bool:
+    return len(first) == len(second) and all(
+        a[0] == b[0] and a[1] is b[1] and a[2] == b[2] for a, b in zip(first, second)
+    )
+
+
+def trusted_fingerprint(model_bundle: dict) -> str | None:
+    """
+    The bundle's file fingerprint, if it still holds exactly the models
+    `load_models` fingerprinted. A copy with a model swapped out (a bootstrap
+    variant, say) keeps the key but gets None here.
+    """
+    fingerprint = model_bundle.get("fingerprint")
+    if fingerprint is None or fingerprint not in _FINGERPRINTED_MODELS:
+        return None
+    return fingerprint if _same_models(_FINGERPRINTED_MODELS[fingerprint], bundle_models(model_bundle)) else None
+
+
+def _register_fingerprint(model_bundle: dict) -> dict:
+    _FINGERPRINTED_MODELS[model_bundle["fingerprint"]] = bundle_models(model_bundle)
+    return model_bundle
+
+
+def load_models(model_dir: Path | str | None = None, *, prefer_native: bool = True) -> dict:
+    """
+    Load the model bundle once per process. Native artifacts from
+    `export_native_models` are preferred: only their manifest is read here
+    and each booster is parsed on its first prediction. An export older than
+    the joblib models is skipped in favour of the joblib files.
+    """
     global _MODEL_CACHE
     if _MODEL_CACHE is not None:
         return _MODEL_CACHE
 
     model_path = _resolve_model_dir(model_dir)
-    winner_model = joblib.load(model_path / "lgbm_winner_model.joblib")
-    spread_model = joblib.load(model_path / "lgbm_spread_model.joblib")
-    meta_model = joblib.load(model_path / "meta_model.joblib")
+    native_path = model_path / NATIVE_MODEL_DIRNAME
+    if prefer_native and (native_path / "manifest.json").exists():
+        if _native_models_current(native_path, model_path):
+            _MODEL_CACHE = _register_fingerprint(_load_native_models(native_path))
+            return _MODEL_CACHE
+        print(
+            f"Warning: native models in {native_path} were exported from different joblib models; "
+            "loading the joblib files. Run export_native_models() to refresh them."
+        )
+
+    import joblib
+
+    model_files = _joblib_model_files(model_path)
+    winner_model, spread_model, meta_model = (joblib.load(path) for path in model_files)
 
     _MODEL_CACHE = {
         "winner": {
@@ -50,59 +243,92 @@ def load_models(model_dir: Path | str | None = None) -> dict:
             "model": meta_model,
             "features": META_FEATURE_COLUMNS,
         },
+        "fingerprint": _files_fingerprint(model_files),
     }
-    return _MODEL_CACHE
+    return _register_fingerprint(_MODEL_CACHE)
 
 
 def apply_prediction_adjustments(feature_df: pd.DataFrame) -> pd.DataFrame:
     adjusted = feature_df.copy()
-    if 'team_home_away' not in adjusted.columns:
+    if 'team_home_away' not in adjusted.columns or 'margin_estimate' not in adjusted.columns:
         return adjusted
 
-    home_mask = adjusted['team_home_away'] == 1
-    away_mask = adjusted['team_home_away'] == 0
+    home_away = adjusted['team_home_away'].to_numpy()
+    shift = np.where(home_away == 1, 1.0, np.where(home_away == 0, -1.0, 0.0))
+    adjusted['margin_estimate'] = adjusted['margin_estimate'].to_numpy() + 7.00 * shift
 
-    if 'margin_estimate' in adjusted.columns:
-        adjusted.loc[home_mask, 'margin_estimate'] = adjusted.loc[home_mask, 'margin_estimate'] + 7.00
-        adjusted.loc[away_mask, 'margin_estimate'] = adjusted.loc[away_mask, 'margin_estimate'] - 7.00
+    if 'point_differential_avg_diff' in adjusted.columns:
+        adjusted['point_differential_avg_diff'] = np.where(
+            shift != 0,
+            adjusted['margin_estimate'].to_numpy() + 6.90 * shift,
+            adjusted['point_differential_avg_diff'].to_numpy(),
+        )
+
+    return adjusted
 
-    if 'point_differential_avg_diff' in adjusted.columns and 'margin_estimate' in adjusted.columns:
-        adjusted.loc[home_mask, 'point_differential_avg_diff'] = adjusted.loc[home_mask, 'margin_estimate'] + 6.90
-        adjusted.loc[away_mask, 'point_differential_avg_diff'] = adjusted.loc[away_mask, 'margin_estimate'] - 6.90
 
+def apply_gui_adjustments(feature_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The home/away shift the GUI has always applied to its feature rows
+    before `predict_meta_ensemble`, which then applies its own on top.
+    """
+    adjusted = feature_df.copy()
+    home = adjusted['team_home_away'] == 1
+    away = adjusted['team_home_away'] == 0
+    adjusted.loc[home, 'margin_estimate'] = adjusted['margin_estimate'] + 7.00
+    adjusted.loc[away, 'margin_estimate'] = adjusted['margin_estimate'] - 7.00
+    adjusted.loc[home, 'point_differential_avg_diff'] = adjusted['point_differential_avg_diff'] + 6.90
+    adjusted.loc[away, 'point_differential_avg_diff'] = adjusted['point_differential_avg_diff'] - 6.90
     return adjusted
 
 
-def predict_base_models(feature_df: pd.DataFrame, model_bundle: dict | None = None) -> tuple[float, float]:
+def predict_base_models_batch(
+    feature_df: pd.DataFrame,
+    model_bundle: dict | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Winner probabilities and spreads for every row, with one adjustment and
+    cleaning pass and a single call per model.
+    """
     models = model_bundle or load_models()
     adjusted = apply_prediction_adjustments(feature_df)
+    cleaned = dp.align_features_for_model(adjusted, adjusted.columns)
 
-    winner_models = models["winner"]
-    winner_X = dp.align_features_for_model(adjusted, winner_models["features"])
-    winner_prob = float(winner_models["model"].predict_proba(winner_X)[:, 1][0])
+    winner_X = cleaned.reindex(columns=list(models["winner"]["features"]), fill_value=0)
+    winner_probs = np.asarray(models["winner"]["model"].predict_proba(winner_X)[:, 1], dtype=float)
 
-    spread_models = models["spread"]
-    spread_X = dp.align_features_for_model(adjusted, spread_models["features"])
-    spread_pred = float(np.asarray(spread_models["model"].predict(spread_X), dtype=float)[0])
+    spread_X = cleaned.reindex(columns=list(models["spread"]["features"]), fill_value=0)
+    spread_preds = np.asarray(models["spread"]["model"].predict(spread_X), dtype=float)
 
-    return winner_prob, spread_pred
+    return winner_probs, spread_preds
 
 
-def predict_meta_ensemble(feature_df: pd.DataFrame, model_bundle: dict | None = None) -> tuple[float, float]:
+def predict_meta_ensemble_batch(
+    feature_df: pd.DataFrame,
+    model_bundle: dict | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
     models = model_bundle or load_models()
-    winner_prob, spread_pred = predict_base_models(feature_df, models)
+    winner_probs, spread_preds = predict_base_models_batch(feature_df, models)
 
     meta_input = pd.DataFrame(
-        [
-            {
-                'winner_model_proba': winner_prob,
-                'spread_model_pred': spread_pred,
-            }
-        ]
+        {
+            'winner_model_proba': winner_probs,
+            'spread_model_pred': spread_preds,
+        }
     )
     meta_X = dp.align_features_for_model(meta_input, models["meta"]["features"])
-    meta_prob = float(models["meta"]["model"].predict_proba(meta_X)[:, 1][0])
-    return meta_prob, spread_pred
+    meta_probs = np.asarray(models["meta"]["model"].predict_proba(meta_X)[:, 1], dtype=float)
+    return meta_probs, spread_preds
+
+
+def predict_base_models(feature_df: pd.DataFrame, model_bundle: dict | None = None) -> tuple[float, float]:
+    winner_probs, spread_preds = predict_base_models_batch(feature_df.iloc[:1], model_bundle)
+    return float(winner_probs[0]), float(spread_preds[0])
+
+
+def predict_meta_ensemble(feature_df: pd.DataFrame, model_bundle: dict | None = None) -> tuple[float, float]:
+    meta_probs, spread_preds = predict_meta_ensemble_batch(feature_df.iloc[:1], model_bundle)
+    return float(meta_probs[0]), float(spread_preds[0])
 
 
 def predict_ensemble(feature_df, model_bundle: dict | None = None) -> tuple[float, float]:
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+import csv
 from dataclasses import dataclass
+import hashlib
+import json
+import os
 from pathlib import Path
 import warnings
 
 import numpy as np
 
+from bracket import Bracket, CompiledBracket, Slot, compile_bracket, single_elimination
 import cached_matchup
 import model_ensemble as ensemble
+import prediction_cache
 
 warnings.filterwarnings("ignore")
 
@@ -25,6 +32,24 @@ _GAME_PRED_DIR = Path(__file__).resolve().parent
 _DATA_DIR = _PROJECT_ROOT / "Data"
 _MODEL_DIR = _GAME_PRED_DIR / "models"
 _MODEL_BUNDLE = None
+_REGION_SLOT_ORDER = [0, 15, 7, 8, 4, 11, 3, 12, 5, 10, 2, 13, 6, 9, 1, 14]
+_SIM_CHUNK_SIZE = 100_000
+_CONVERGENCE_BATCH_SIZE = 25_000
+_CONFIDENCE_Z = 1.96
+_PROB_MATRIX_CACHE: dict[tuple, np.ndarray] = {}
+
+REGION_ORDER = ["East", "South", "West", "Midwest"]
+FINAL_FOUR_PAIRINGS = (("East", "South"), ("West", "Midwest"))
+ROUND_KEYS = ['round_of_32', 'sweet_16', 'elite_8', 'final_4', 'national_championship', 'champion']
+ROUND_LABELS = {
+    'round_of_64': 'Round of 64',
+    'round_of_32': 'Round of 32',
+    'sweet_16': 'Sweet 16',
+    'elite_8': 'Elite 8',
+    'final_4': 'Final 4',
+    'national_championship': 'National Championship',
+    'champion': 'Champion',
+}
 
 
 def _get_model_bundle():
@@ -71,16 +96,37 @@ def _predict_win_prob(team_a: Team, team_b: Team) -> float:
     return win_prob
 
 
+def _predict_win_probs(teams, pairs: np.ndarray, model_bundle: dict | None = None) -> np.ndarray:
+    model_bundle = model_bundle or _get_model_bundle()
+    seasons = np.array([_resolve_season(teams[i], teams[j]) for i, j in pairs], dtype=int)
+    probs = np.empty(len(pairs), dtype=float)
+
+    for season in np.unique(seasons):
+        season_mask = seasons == season
+        season_pairs = pairs[season_mask]
+
+        print(f"Predicting {len(season_pairs)} matchups for {season}")
+        probs[season_mask], _ = prediction_cache.predict_matchups(
+            [(teams[i].name, teams[j].name, 3, 2) for i, j in season_pairs],
+            int(season),
+            model_bundle,
+        )
+
+    return probs
+
+
 def sanity_check_team_mappings(teams, season: int | None = None):
     if not teams:
         return []
 
     resolved_season = int(season) if season is not None else int(teams[0].season or _latest_season_from_data())
-    team_id_map = cached_matchup._load_team_id_map(resolved_season)
+    resolver = cached_matchup._load_team_resolver(resolved_season)
 
     missing = []
     for team in teams:
-        if cached_matchup._team_key(team.name) not in team_id_map:
+        try:
+            resolver.resolve(team.name, fuzzy=False)
+        except KeyError:
             missing.append(team.name)
 
     if missing:
@@ -93,168 +139,612 @@ def sanity_check_team_mappings(teams, season: int | None = None):
     return missing
 
 
-def _ordered_64_team_field(teams):
-    if len(teams) != 64:
-        raise ValueError("simulate_tournament expects exactly 64 teams.")
+def ncaa_tournament_bracket(
+    teams,
+    region_order=REGION_ORDER,
+    final_four_pairings=FINAL_FOUR_PAIRINGS,
+):
+    """
+    Order an NCAA field by region and seed and build its bracket.
 
-    region_order = ["East", "South", "West", "Midwest"]
+    Each region needs seeds 1-16; two teams sharing a region and seed meet in
+    a First Four game whose winner takes that seed's slot. Teams without a
+    region must already be 64 teams in region-then-seed order.
+    """
     if all(getattr(team, "region", None) for team in teams):
         region_map = {region: [] for region in region_order}
         for team in teams:
             if team.region not in region_map:
-                raise ValueError(f"Unexpected region '{team.region}'. Expected one of {region_order}.")
+                raise ValueError(f"Unexpected region '{team.region}'. Expected one of {list(region_order)}.")
             region_map[team.region].append(team)
+        region_fields = [sorted(region_map[region], key=lambda team: team.seed) for region in region_order]
+        region_seeds = [[int(team.seed) for team in region_teams] for region_teams in region_fields]
+    else:
+        if len(teams) != 16 * len(region_order):
+            raise ValueError(f"Teams without regions must be exactly {16 * len(region_order)} teams in seed order.")
+        region_fields = [list(teams[k * 16:(k + 1) * 16]) for k in range(len(region_order))]
+        region_seeds = [list(range(1, 17)) for _ in region_order]
+
+    has_play_ins = any(len(seeds) != len(set(seeds)) for seeds in region_seeds)
+    region_round_keys = ROUND_KEYS[:4]
+    ordered = []
+    region_roots = {}
+    for region, region_teams, seeds in zip(region_order, region_fields, region_seeds):
+        seats_by_seed = {}
+        for team, seed in zip(region_teams, seeds):
+            seats_by_seed.setdefault(seed, []).append(Slot.seat(len(ordered)))
+            ordered.append(team)
+
+        if sorted(seats_by_seed) != list(range(1, 17)) or any(len(seats) > 2 for seats in seats_by_seed.values()):
+            raise ValueError(
+                f"Region {region} must contain seeds 1-16, with at most two teams sharing a seed (First Four)."
+            )
+
+        entries = []
+        for seed_idx in _REGION_SLOT_ORDER:
+            seats = seats_by_seed[seed_idx + 1]
+            entries.append(seats[0] if len(seats) == 1 else Slot.game(seats[0], seats[1], 'round_of_64'))
+        region_roots[region] = single_elimination(entries, region_round_keys)
+
+    semifinals = [
+        Slot.game(region_roots[top], region_roots[bottom], 'national_championship')
+        for top, bottom in final_four_pairings
+    ]
+    if len(semifinals) != 2:
+        raise ValueError("final_four_pairings must pair the regions into exactly two semifinals.")
 
-        ordered = []
-        for region in region_order:
-            region_teams = sorted(region_map[region], key=lambda team: team.seed)
-            if len(region_teams) != 16:
-                raise ValueError(f"Region {region} must contain exactly 16 teams.")
-            ordered.extend(region_teams)
-        return ordered
-
-    return teams
-
-
-def _build_prob_lookup(teams, prob_lookup=None):
-    cache: dict[tuple[int, int], float] = {}
-
-    def get_prob(i: int, j: int) -> float:
-        if i == j:
-            return 0.5
-
-        key = (i, j)
-        if key in cache:
-            return cache[key]
-
-        if prob_lookup:
-            p = float(prob_lookup(teams[i], teams[j]))
-        else:
-            print(f"Predicting win probability for {teams[i].name} vs {teams[j].name}")
-            p = float(_predict_win_prob(teams[i], teams[j]))
-
-        cache[(i, j)] = p
-        cache[(j, i)] = 1.0 - p
-        return p
+    round_keys = (['round_of_64'] if has_play_ins else []) + ROUND_KEYS
+    return ordered, Bracket(Slot.game(semifinals[0], semifinals[1], 'champion'), round_keys)
 
-    return get_prob
 
+def _prepare_field(teams, bracket: Bracket | None = None) -> tuple[list, CompiledBracket]:
+    if bracket is None:
+        teams, bracket = ncaa_tournament_bracket(teams)
+    teams = list(teams)
+    return teams, compile_bracket(bracket, len(teams))
 
-def _play_region(get_prob, base_idx, sims, rng):
-    def play_match(a_idx, b_idx):
-        p = np.fromiter((get_prob(int(a), int(b)) for a, b in zip(a_idx, b_idx)), dtype=float, count=len(a_idx))
-        r = rng.random(size=a_idx.shape[0])
-        return np.where(r < p, a_idx, b_idx)
 
-    seeds = list(range(base_idx, base_idx + 16))
+def _build_prob_matrix(teams, compiled: CompiledBracket, prob_lookup=None, model_bundle: dict | None = None) -> np.ndarray:
+    n = len(teams)
+    pairs = compiled.matchup_pairs()
 
-    r32_1 = play_match(np.full(sims, seeds[0]), np.full(sims, seeds[15]))
-    r32_2 = play_match(np.full(sims, seeds[7]), np.full(sims, seeds[8]))
-    r32_3 = play_match(np.full(sims, seeds[4]), np.full(sims, seeds[11]))
-    r32_4 = play_match(np.full(sims, seeds[3]), np.full(sims, seeds[12]))
-    r32_5 = play_match(np.full(sims, seeds[5]), np.full(sims, seeds[10]))
-    r32_6 = play_match(np.full(sims, seeds[2]), np.full(sims, seeds[13]))
-    r32_7 = play_match(np.full(sims, seeds[6]), np.full(sims, seeds[9]))
-    r32_8 = play_match(np.full(sims, seeds[1]), np.full(sims, seeds[14]))
+    if prob_lookup:
+        probs = np.array([float(prob_lookup(teams[i], teams[j])) for i, j in pairs], dtype=float)
+    else:
+        probs = _predict_win_probs(teams, pairs, model_bundle)
+
+    prob_matrix = np.full((n, n), 0.5, dtype=float)
+    prob_matrix[pairs[:, 0], pairs[:, 1]] = probs
+    prob_matrix[pairs[:, 1], pairs[:, 0]] = 1.0 - probs
+    return prob_matrix
+
+
+def build_prob_matrix(
+    teams,
+    prob_lookup=None,
+    *,
+    bracket: Bracket | None = None,
+    model_bundle: dict | None = None,
+) -> np.ndarray:
+    """
+    Precompute the dense win-probability matrix for a field.
+
+    `matrix[i, j]` is the probability that team `i` beats team `j`, with
+    teams in `ncaa_tournament_bracket` order (or as given with `bracket`).
+    Without `prob_lookup`, every reachable pair's feature row is built in one
+    batched pass per season and scored with a single call per model, using
+    `model_bundle` (e.g. a bootstrap variant) in place of the saved models.
+    """
+    teams, compiled = _prepare_field(teams, bracket)
+    return _build_prob_matrix(teams, compiled, prob_lookup, model_bundle)
+
+
+def _forced_winners(teams, compiled: CompiledBracket, completed_games=None) -> np.ndarray | None:
+    if not completed_games:
+        return None
+
+    team_index = {team.name: idx for idx, team in enumerate(teams)}
+    results = []
+    for winner, loser in completed_games:
+        for name in (winner, loser):
+            if name not in team_index:
+                raise KeyError(f"Team '{name}' is not in this field.")
+        results.append((team_index[winner], team_index[loser]))
+    return compiled.forced_winners(results)
+
+
+def _simulate_bracket(
+    prob_matrix: np.ndarray,
+    compiled: CompiledBracket,
+    sims: int,
+    rng: np.random.Generator,
+    forced: np.ndarray | None = None,
+    matrix_idx: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Play `sims` brackets at once and return each game's winner as a
+    `(sims, n_games)` array.
+
+    Every level of independent games is played with one fancy-indexing
+    lookup into the probability matrix. Games with a `forced` winner
+    (>= 0) are filled in directly and never sampled. With a stack of
+    matrices, sim `s` plays on `prob_matrix[matrix_idx[s]]`.
+    """
+    n = compiled.n_teams
+    state = np.empty((sims, n + compiled.n_games), dtype=np.min_scalar_type(max(n - 1, 0)))
+    state[:, :n] = np.arange(n)
+    for games in compiled.levels:
+        if forced is not None:
+            locked = forced[games] >= 0
+            state[:, n + games[locked]] = forced[games[locked]]
+            games = games[~locked]
+            if not len(games):
+                continue
+        a_idx = state[:, compiled.game_top[games]]
+        b_idx = state[:, compiled.game_bottom[games]]
+        p = prob_matrix[a_idx, b_idx] if matrix_idx is None else prob_matrix[matrix_idx[:, None], a_idx, b_idx]
+        state[:, n + games] = np.where(rng.random(size=a_idx.shape) < p, a_idx, b_idx)
+    return state[:, n:]
+
+
+def _simulate_round_counts(
+    prob_matrix: np.ndarray,
+    compiled: CompiledBracket,
+    sims: int,
+    rng: np.random.Generator,
+    chunk_size: int = _SIM_CHUNK_SIZE,
+    forced: np.ndarray | None = None,
+    matrix_batch: int = _CONVERGENCE_BATCH_SIZE,
+) -> np.ndarray:
+    n = compiled.n_teams
+    round_games = [compiled.game_round == round_idx for round_idx in range(len(compiled.round_keys))]
+    counts = np.zeros((len(compiled.round_keys), n), dtype=np.int64)
+    for start in range(0, sims, chunk_size):
+        chunk_sims = min(chunk_size, sims - start)
+        matrix_idx = None if prob_matrix.ndim == 2 else np.arange(start, start + chunk_sims) // matrix_batch
+        winners = _simulate_bracket(prob_matrix, compiled, chunk_sims, rng, forced, matrix_idx)
+        for round_idx, games in enumerate(round_games):
+            counts[round_idx] += np.bincount(winners[:, games].ravel(), minlength=n)
+    counts[compiled.bye_rounds] = sims
+    return counts
+
+
+def _standard_errors(counts: np.ndarray, sims: int) -> np.ndarray:
+    probs = counts / sims
+    return np.sqrt(probs * (1.0 - probs) / sims)
+
+
+def _simulate_until_converged(
+    prob_matrix: np.ndarray,
+    compiled: CompiledBracket,
+    max_sims: int,
+    rng: np.random.Generator,
+    tolerance: float,
+    batch_size: int = _CONVERGENCE_BATCH_SIZE,
+    forced: np.ndarray | None = None,
+) -> tuple[np.ndarray, int]:
+    """
+    Simulate in batches until every champion probability's 95% confidence
+    half-width is within `tolerance`, or `max_sims` have been played. A stack
+    of matrices supplies one matrix per batch.
+    """
+    counts = np.zeros((len(compiled.round_keys), compiled.n_teams), dtype=np.int64)
+    sims_run = 0
+    while sims_run < max_sims:
+        batch_sims = min(batch_size, max_sims - sims_run)
+        batch_matrix = prob_matrix if prob_matrix.ndim == 2 else prob_matrix[sims_run // batch_size]
+        counts += _simulate_round_counts(batch_matrix, compiled, batch_sims, rng, forced=forced)
+        sims_run += batch_sims
+
+        half_width = _CONFIDENCE_Z * _standard_errors(counts[-1], sims_run)
+        if half_width.max() <= tolerance:
+            print(f"Converged after {sims_run} sims (max champion CI +/-{half_width.max():.4%})")
+            break
+    else:
+        print(f"Sim budget of {max_sims} reached before converging to +/-{tolerance:.4%}")
+    return counts, sims_run
+
+
+def _draw_prob_matrices(
+    prob_matrix: np.ndarray | None,
+    n_draws: int,
+    rng: np.random.Generator,
+    logit_noise: float | None = None,
+    prob_matrices=None,
+) -> np.ndarray:
+    """
+    Draw `n_draws` pairwise matrices as a `(n_draws, n, n)` stack.
+
+    Each draw is picked from the bootstrap `prob_matrices` (or is the base
+    matrix), then shifted by antisymmetric normal noise in logit space so
+    `matrix[j, i]` stays `1 - matrix[i, j]`.
+    """
+    if prob_matrices is not None:
+        draws = prob_matrices[rng.integers(len(prob_matrices), size=n_draws)]
+    else:
+        draws = np.broadcast_to(prob_matrix, (n_draws,) + prob_matrix.shape)
 
-    round_of_32 = np.stack([r32_1, r32_2, r32_3, r32_4, r32_5, r32_6, r32_7, r32_8], axis=1)
+    if logit_noise:
+        if logit_noise < 0:
+            raise ValueError("logit_noise must be non-negative.")
+        clipped = np.clip(draws, 1e-6, 1.0 - 1e-6)
+        noise = np.triu(rng.normal(0.0, logit_noise, size=draws.shape), k=1)
+        logits = np.log(clipped) - np.log1p(-clipped) + noise - noise.transpose(0, 2, 1)
+        draws = 1.0 / (1.0 + np.exp(-logits))
+    return np.ascontiguousarray(draws)
 
-    s16_1 = play_match(r32_1, r32_2)
-    s16_2 = play_match(r32_3, r32_4)
-    s16_3 = play_match(r32_5, r32_6)
-    s16_4 = play_match(r32_7, r32_8)
 
-    sweet_16 = np.stack([s16_1, s16_2, s16_3, s16_4], axis=1)
+def _round_results(teams, probs: np.ndarray, round_keys, stderr: np.ndarray | None = None) -> dict:
+    results = {}
+    for i, team in enumerate(teams):
+        results[team.name] = {key: float(probs[round_idx, i]) for round_idx, key in enumerate(round_keys)}
+        if stderr is not None:
+            for round_idx, key in enumerate(round_keys):
+                results[team.name][f'{key}_stderr'] = float(stderr[round_idx, i])
+    return results
 
-    e8_1 = play_match(s16_1, s16_2)
-    e8_2 = play_match(s16_3, s16_4)
 
-    elite_8 = np.stack([e8_1, e8_2], axis=1)
-    final_4_team = play_match(e8_1, e8_2)
+def _counts_to_results(
+    teams,
+    compiled: CompiledBracket,
+    counts: np.ndarray,
+    sims: int,
+    *,
+    include_stderr: bool = False,
+) -> dict:
+    stderr = _standard_errors(counts, sims) if include_stderr else None
+    return _round_results(teams, counts / sims, compiled.round_keys, stderr)
+
+
+def _cached_prob_matrix(teams, compiled: CompiledBracket, prob_lookup=None, matrix_key: str | None = None) -> np.ndarray:
+    """
+    The field's matrix, built once per process. Model-built matrices are
+    cached under `_prob_matrix_key`, so a changed bundle or season data builds
+    a new one instead of reusing the old.
+    """
+    if prob_lookup is None and matrix_key is None:
+        matrix_key = _prob_matrix_key(teams, compiled)
+    cache_key = (
+        tuple((team.name, team.season) for team in teams),
+        compiled.matchup_pairs().tobytes(),
+        prob_lookup,
+        matrix_key,
+    )
+    if cache_key not in _PROB_MATRIX_CACHE:
+        _PROB_MATRIX_CACHE[cache_key] = _build_prob_matrix(teams, compiled, prob_lookup)
+    return _PROB_MATRIX_CACHE[cache_key]
+
+
+def _prob_matrix_key(teams, compiled: CompiledBracket) -> str:
+    """
+    Hash of everything a model-built matrix depends on: the field in bracket
+    order, the reachable pairs, the model bundle and each season's data.
+    """
+    pairs = compiled.matchup_pairs()
+    seasons = sorted({int(_resolve_season(teams[i], teams[j])) for i, j in pairs})
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[team.name, team.season] for team in teams]).encode())
+    digest.update(pairs.tobytes())
+    digest.update(prediction_cache.model_bundle_hash(_get_model_bundle()).encode())
+    for season in seasons:
+        digest.update(f"{season}:{prediction_cache.data_snapshot_hash(season)}".encode())
+    return digest.hexdigest()
+
+
+def _resolve_prob_matrix(teams, compiled: CompiledBracket, prob_lookup=None, prob_matrix=None) -> np.ndarray:
+    """
+    Use the given matrix, or build one for the field once per process. A
+    path loads a saved `.npy` matrix, or builds and saves it, so reruns between
+    sessions skip the pairwise predictions entirely. The saved matrix is only
+    reused while the key stored next to it (see `_prob_matrix_key`) still
+    matches; matrices from a custom `prob_lookup` are never reused.
+    """
+    n = len(teams)
+    if isinstance(prob_matrix, (str, Path)):
+        matrix_path = Path(prob_matrix)
+        key_path = matrix_path.with_suffix(".key")
+        matrix_key = _prob_matrix_key(teams, compiled) if prob_lookup is None else None
+        if (
+            matrix_key is not None
+            and matrix_path.exists()
+            and key_path.exists()
+            and key_path.read_text().strip() == matrix_key
+        ):
+            prob_matrix = np.load(matrix_path)
+        else:
+            prob_matrix = _cached_prob_matrix(teams, compiled, prob_lookup, matrix_key)
+            matrix_path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(matrix_path, prob_matrix)
+            if matrix_key is not None:
+                key_path.write_text(matrix_key)
+            else:
+                key_path.unlink(missing_ok=True)
+    elif prob_matrix is None:
+        prob_matrix = _cached_prob_matrix(teams, compiled, prob_lookup)
+    prob_matrix = np.asarray(prob_matrix, dtype=float)
+    if prob_matrix.shape != (n, n):
+        raise ValueError(f"prob_matrix must have shape ({n}, {n}).")
+    return prob_matrix
+
+
+def simulate_tournament(
+    teams,
+    prob_lookup=None,
+    sims=1000,
+    *,
+    prob_matrix=None,
+    bracket: Bracket | None = None,
+    seed=None,
+    tolerance: float | None = None,
+    batch_size: int = _CONVERGENCE_BATCH_SIZE,
+    completed_games=None,
+    logit_noise: float | None = None,
+    prob_matrices=None,
+):
+    """
+    Simulate the bracket and return each team's per-round advancement odds.
+
+    Without `bracket`, `teams` is laid out with `ncaa_tournament_bracket`.
+    With `tolerance`, `sims` becomes a budget: batches of `batch_size` are
+    played until every champion probability's 95% confidence half-width is
+    within `tolerance`, and each round's standard error is returned under a
+    `<round>_stderr` key.
+
+    `completed_games` lists decided games as (winner name, loser name); they
+    are locked in and only the remaining games are sampled. `prob_matrix`
+    may be a matrix, or a `.npy` path to reuse across reruns.
+
+    To carry model uncertainty into the results, each batch of `batch_size`
+    sims plays on its own matrix: one of the bootstrap `prob_matrices`
+    (e.g. from `build_prob_matrix` with resampled model bundles) and/or the
+    base matrix with `logit_noise` standard deviation of logit-space noise.
+    """
+    teams, compiled = _prepare_field(teams, bracket)
+    if prob_matrices is None:
+        prob_matrix = _resolve_prob_matrix(teams, compiled, prob_lookup=prob_lookup, prob_matrix=prob_matrix)
+    else:
+        n = len(teams)
+        prob_matrices = np.asarray(prob_matrices, dtype=float)
+        if prob_matrices.ndim != 3 or prob_matrices.shape[1:] != (n, n):
+            raise ValueError(f"prob_matrices must stack matrices of shape ({n}, {n}).")
+    forced = _forced_winners(teams, compiled, completed_games)
+
+    rng = np.random.default_rng(seed)
+    if logit_noise or prob_matrices is not None:
+        n_batches = -(-int(sims) // batch_size)
+        prob_matrix = _draw_prob_matrices(prob_matrix, n_batches, rng, logit_noise, prob_matrices)
+
+    if tolerance is None:
+        counts = _simulate_round_counts(prob_matrix, compiled, sims, rng, forced=forced, matrix_batch=batch_size)
+        return _counts_to_results(teams, compiled, counts, sims)
+
+    counts, sims_run = _simulate_until_converged(
+        prob_matrix, compiled, sims, rng, tolerance, batch_size, forced=forced
+    )
+    return _counts_to_results(teams, compiled, counts, sims_run, include_stderr=True)
 
-    return {
-        'round_of_32': round_of_32,
-        'sweet_16': sweet_16,
-        'elite_8': elite_8,
-        'final_4_team': final_4_team,
-    }
 
+def write_probabilities_csv(results: dict, path: Path | str = "tournament_probabilities.csv") -> None:
+    first = next(iter(results.values()))
+    round_keys = [key for key in first if not key.endswith('_stderr')]
+    include_ci = f'{round_keys[0]}_stderr' in first
 
-def simulate_tournament(teams, prob_lookup=None, sims=1000):
-    teams = _ordered_64_team_field(teams)
-    n = len(teams)
-    get_prob = _build_prob_lookup(teams, prob_lookup=prob_lookup)
-    rng = np.random.default_rng()
-
-    def play_match(a_idx, b_idx):
-        p = np.fromiter((get_prob(int(a), int(b)) for a, b in zip(a_idx, b_idx)), dtype=float, count=len(a_idx))
-        r = rng.random(size=a_idx.shape[0])
-        return np.where(r < p, a_idx, b_idx)
-
-    east = _play_region(get_prob, 0, sims, rng)
-    south = _play_region(get_prob, 16, sims, rng)
-    west = _play_region(get_prob, 32, sims, rng)
-    midwest = _play_region(get_prob, 48, sims, rng)
-
-    round_of_32_counts = np.bincount(
-        np.concatenate([
-            east['round_of_32'].ravel(),
-            south['round_of_32'].ravel(),
-            west['round_of_32'].ravel(),
-            midwest['round_of_32'].ravel(),
-        ]),
-        minlength=n,
-    ).astype(float)
-    sweet_16_counts = np.bincount(
-        np.concatenate([
-            east['sweet_16'].ravel(),
-            south['sweet_16'].ravel(),
-            west['sweet_16'].ravel(),
-            midwest['sweet_16'].ravel(),
-        ]),
-        minlength=n,
-    ).astype(float)
-    elite_8_counts = np.bincount(
-        np.concatenate([
-            east['elite_8'].ravel(),
-            south['elite_8'].ravel(),
-            west['elite_8'].ravel(),
-            midwest['elite_8'].ravel(),
-        ]),
-        minlength=n,
-    ).astype(float)
-
-    final_four_teams = np.stack(
-        [
-            east['final_4_team'],
-            south['final_4_team'],
-            west['final_4_team'],
-            midwest['final_4_team'],
-        ],
-        axis=1,
-    )
-    final_4_counts = np.bincount(final_four_teams.ravel(), minlength=n).astype(float)
+    fieldnames = ["Team"]
+    for key in round_keys:
+        fieldnames.append(ROUND_LABELS.get(key, key))
+        if include_ci:
+            fieldnames.append(f"{ROUND_LABELS.get(key, key)} CI")
 
-    semifinal_1_winner = play_match(east['final_4_team'], south['final_4_team'])
-    semifinal_2_winner = play_match(west['final_4_team'], midwest['final_4_team'])
-    national_championship_teams = np.stack([semifinal_1_winner, semifinal_2_winner], axis=1)
-    national_championship_counts = np.bincount(national_championship_teams.ravel(), minlength=n).astype(float)
+    with open(path, "w", newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for team, probs in sorted(results.items(), key=lambda x: -x[1][round_keys[-1]]):
+            row = {"Team": str(team)}
+            for key in round_keys:
+                label = ROUND_LABELS.get(key, key)
+                row[label] = probs[key] * 100
+                if include_ci:
+                    row[f"{label} CI"] = _CONFIDENCE_Z * probs[f'{key}_stderr'] * 100
+            writer.writerow(row)
+
+
+def compute_exact_probabilities(
+    teams,
+    prob_lookup=None,
+    *,
+    prob_matrix=None,
+    bracket: Bracket | None = None,
+    completed_games=None,
+) -> dict:
+    """
+    Exact per-round advancement probabilities, with no sampling noise.
+
+    Games are independent given the pairwise matrix, so each game's winner
+    distribution follows by dynamic programming over the bracket tree: a team
+    wins a game with its chance of emerging from its side times its expected
+    win probability against the other side's winner distribution. Returns the
+    same results shape as `simulate_tournament`, and locks `completed_games`
+    the same way.
+    """
+    teams, compiled = _prepare_field(teams, bracket)
+    prob_matrix = _resolve_prob_matrix(teams, compiled, prob_lookup=prob_lookup, prob_matrix=prob_matrix)
+    forced = _forced_winners(teams, compiled, completed_games)
+
+    n = compiled.n_teams
+    winner_dist = np.zeros((n + compiled.n_games, n), dtype=float)
+    winner_dist[:n] = np.eye(n)
+    for games in compiled.levels:
+        top = winner_dist[compiled.game_top[games]]
+        bottom = winner_dist[compiled.game_bottom[games]]
+        winner_dist[n + games] = top * (bottom @ prob_matrix.T) + bottom * (top @ prob_matrix.T)
+        if forced is not None:
+            locked = games[forced[games] >= 0]
+            winner_dist[n + locked] = np.eye(n)[forced[locked]]
+
+    probs = np.zeros((len(compiled.round_keys), n), dtype=float)
+    np.add.at(probs, compiled.game_round, winner_dist[n:])
+    probs[compiled.bye_rounds] = 1.0
+    return _round_results(teams, probs, compiled.round_keys)
 
-    champions = play_match(semifinal_1_winner, semifinal_2_winner)
-    champion_counts = np.bincount(champions, minlength=n).astype(float)
 
-    results = {}
-    for i, team in enumerate(teams):
-        results[team.name] = {
-            'round_of_32': round_of_32_counts[i] / sims,
-            'sweet_16': sweet_16_counts[i] / sims,
-            'elite_8': elite_8_counts[i] / sims,
-            'final_4': final_4_counts[i] / sims,
-            'national_championship': national_championship_counts[i] / sims,
-            'champion': champion_counts[i] / sims,
-        }
+@dataclass
+class SimulatedBrackets:
+    """
+    Every simulated bracket's game winners, one row per sim.
+
+    `winners[s, g]` is the field index of the team that won game `g` (in
+    `compiled` play order) in sim `s`, stored as uint8 and optionally
+    memory-mapped from disk.
+    """
+    teams: list
+    compiled: CompiledBracket
+    winners: np.ndarray
+
+    @property
+    def sims(self) -> int:
+        return self.winners.shape[0]
+
+    def team_index(self, team_name: str) -> int:
+        for idx, team in enumerate(self.teams):
+            if team.name == team_name:
+                return idx
+        raise KeyError(f"Team '{team_name}' is not in this field.")
+
+    def reached(self, team_name: str, round_key: str) -> np.ndarray:
+        team_idx = self.team_index(team_name)
+        round_idx = self.compiled.round_keys.index(round_key)
+        if self.compiled.bye_rounds[round_idx, team_idx]:
+            return np.ones(self.sims, dtype=bool)
+        games = np.flatnonzero(self.compiled.game_round == round_idx)
+        return (self.winners[:, games] == team_idx).any(axis=1)
+
+    def joint_probability(self, requirements: dict[str, str]) -> float:
+        """Probability that every `team -> round_key` requirement holds in the same bracket."""
+        mask = np.ones(self.sims, dtype=bool)
+        for team_name, round_key in requirements.items():
+            mask &= self.reached(team_name, round_key)
+        return float(mask.mean())
+
+    def round_results(self) -> dict:
+        n = self.compiled.n_teams
+        counts = np.zeros((len(self.compiled.round_keys), n), dtype=np.int64)
+        for start in range(0, self.sims, _SIM_CHUNK_SIZE):
+            chunk = np.asarray(self.winners[start:start + _SIM_CHUNK_SIZE])
+            for round_idx in range(len(self.compiled.round_keys)):
+                games = self.compiled.game_round == round_idx
+                counts[round_idx] += np.bincount(chunk[:, games].ravel(), minlength=n)
+        counts[self.compiled.bye_rounds] = self.sims
+        return _counts_to_results(self.teams, self.compiled, counts, self.sims)
+
+    def most_common_brackets(self, top: int = 10) -> list[tuple[list[tuple[str, str]], float]]:
+        """The `top` most frequent full brackets as ((round_key, winner) per game, frequency)."""
+        brackets, counts = np.unique(np.asarray(self.winners), axis=0, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:top]
+        return [(self.describe(brackets[idx]), counts[idx] / self.sims) for idx in order]
+
+    def describe(self, bracket_winners: np.ndarray) -> list[tuple[str, str]]:
+        return [
+            (self.compiled.round_keys[round_idx], self.teams[int(team_idx)].name)
+            for round_idx, team_idx in zip(self.compiled.game_round, bracket_winners)
+        ]
 
-    return results
+    @classmethod
+    def load(cls, path: Path | str, teams, bracket: Bracket | None = None) -> SimulatedBrackets:
+        teams, compiled = _prepare_field(teams, bracket)
+        winners = np.load(path, mmap_mode='r')
+        if winners.shape[1] != compiled.n_games:
+            raise ValueError(f"{path} stores {winners.shape[1]} games per sim; this bracket has {compiled.n_games}.")
+        return cls(teams, compiled, winners)
+
+
+def simulate_bracket_outcomes(
+    teams,
+    prob_lookup=None,
+    sims=1000,
+    *,
+    prob_matrix=None,
+    bracket: Bracket | None = None,
+    seed=None,
+    path: Path | str | None = None,
+    completed_games=None,
+) -> SimulatedBrackets:
+    """
+    Simulate `sims` brackets and keep every game winner for later scoring.
+
+    With `path`, winners are written chunk by chunk to a memory-mapped `.npy`
+    file (63 bytes per sim for a 64-team field) instead of held in memory.
+    """
+    teams, compiled = _prepare_field(teams, bracket)
+    prob_matrix = _resolve_prob_matrix(teams, compiled, prob_lookup=prob_lookup, prob_matrix=prob_matrix)
+    if compiled.n_teams > 256:
+        raise ValueError("Stored outcomes use uint8 team indices; fields are limited to 256 teams.")
+    forced = _forced_winners(teams, compiled, completed_games)
+
+    shape = (int(sims), compiled.n_games)
+    if path is None:
+        winners = np.empty(shape, dtype=np.uint8)
+    else:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        winners = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, sims, _SIM_CHUNK_SIZE):
+        chunk_sims = min(_SIM_CHUNK_SIZE, sims - start)
+        winners[start:start + chunk_sims] = _simulate_bracket(prob_matrix, compiled, chunk_sims, rng, forced)
+
+    if isinstance(winners, np.memmap):
+        winners.flush()
+    return SimulatedBrackets(teams, compiled, winners)
+
+
+def _simulate_worker_counts(
+    prob_matrix: np.ndarray,
+    compiled: CompiledBracket,
+    sims: int,
+    seed_seq: np.random.SeedSequence,
+    forced: np.ndarray | None = None,
+) -> np.ndarray:
+    return _simulate_round_counts(prob_matrix, compiled, sims, np.random.default_rng(seed_seq), forced=forced)
+
+
+def simulate_tournament_parallel(
+    teams,
+    prob_lookup=None,
+    sims=1000,
+    *,
+    prob_matrix=None,
+    bracket: Bracket | None = None,
+    workers: int | None = None,
+    seed=None,
+    completed_games=None,
+):
+    """
+    Split `sims` across a process pool and merge the per-round tallies.
+
+    Worker `k` plays a fixed share of the sims from the `k`-th
+    `SeedSequence(seed).spawn` child, so results are bit-reproducible for a
+    given `seed` and `workers`.
+    """
+    teams, compiled = _prepare_field(teams, bracket)
+    prob_matrix = _resolve_prob_matrix(teams, compiled, prob_lookup=prob_lookup, prob_matrix=prob_matrix)
+    forced = _forced_winners(teams, compiled, completed_games)
+
+    workers = max(1, min(int(workers or os.cpu_count() or 1), sims))
+    worker_sims = [sims // workers + (1 if k < sims % workers else 0) for k in range(workers)]
+    seed_seqs = np.random.SeedSequence(seed).spawn(workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        worker_counts = pool.map(
+            _simulate_worker_counts,
+            [prob_matrix] * workers,
+            [compiled] * workers,
+            worker_sims,
+            seed_seqs,
+            [forced] * workers,
+        )
+        counts = np.sum(list(worker_counts), axis=0)
+
+    return _counts_to_results(teams, compiled, counts, sims)
 
 
 if __name__ == "__main__":
@@ -341,29 +831,16 @@ if __name__ == "__main__":
             print(f" - {name}")
         exit(1)
 
-    results = simulate_tournament(teams, None, sims=100000)
-    import csv
-
-    with open("tournament_probabilities.csv", "w", newline='') as csvfile:
-        fieldnames = [
-            "Team",
-            "Round of 32",
-            "Sweet 16",
-            "Elite 8",
-            "Final 4",
-            "National Championship",
-            "Champion"
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for team, probs in sorted(results.items(), key=lambda x: -x[1]['champion']):
-            writer.writerow({
-                "Team": str(team),
-                "Round of 32": probs['round_of_32'] * 100,
-                "Sweet 16": probs['sweet_16'] * 100,
-                "Elite 8": probs['elite_8'] * 100,
-                "Final 4": probs['final_4'] * 100,
-                "National Championship": probs['national_championship'] * 100,
-                "Champion": probs['champion'] * 100
-            })
+    # Decided games as (winner, loser); rerun after each session with results added.
+    completed_games = []
+
+    results = simulate_tournament(
+        teams,
+        None,
+        sims=1_000_000,
+        tolerance=0.002,
+        prob_matrix=_DATA_DIR / "cached_data" / f"prob_matrix_{tournament_year}.npy",
+        completed_games=completed_games,
+    )
+    write_probabilities_csv(results, "tournament_probabilities.csv")
     print('Tournament probabilities saved to tournament_probabilities.csv')
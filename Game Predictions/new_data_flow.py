@@ -1,9 +1,31 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
 from pathlib import Path
 import re
 
 import pandas as pd
 
-from data_processing import process_all_games, load_conference_mapping, GAME_RESULTS_DIR, DATA_DIR, PROJECT_ROOT
+from feature_store import build_feature_store
+from data_processing import (
+    process_all_games,
+    load_conference_mapping,
+    advance_elo_ratings,
+    compact_elo_state,
+    expand_elo_state,
+    load_elo_state,
+    save_elo_state,
+    CONFERENCE_MAP_PATH,
+    ELO_INPUT_COLUMNS,
+    STAGE_VERSIONS,
+    GAME_RESULTS_DIR,
+    DATA_DIR,
+    PROJECT_ROOT,
+)
+
+SEASON_DATASET_DIR = DATA_DIR / 'cached_data' / 'season_datasets'
 
 
 def get_year_from_games_filename(path: Path) -> str:
@@ -11,7 +33,35 @@ def get_year_from_games_filename(path: Path) -> str:
     return match.group(1) if match else 'unknown'
 
 
-def main() -> None:
+def _file_signature(path: Path) -> list:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _elo_state_digest(state: dict) -> str:
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _build_season(games_file: Path, year: str, elo_state: dict) -> pd.DataFrame:
+    """One season's dataset rows, starting from the Elo state the earlier seasons left."""
+    print(f'Processing {games_file}...')
+    elo_ratings, elo_last_season = expand_elo_state(elo_state)
+    df = pd.read_csv(games_file)
+    df['season'] = int(year)
+    return process_all_games(df, load_conference_mapping(), elo_ratings, elo_last_season)
+
+
+def main(incremental: bool = False, workers: int | None = None) -> None:
+    """
+    Build dataset.csv from every games file. Elo ratings, the only state
+    carried between seasons, are advanced in one quick sequential pass; the
+    seasons' features are then built in parallel and concatenated in order.
+
+    Each season's rows and closing Elo state are saved as they are built;
+    with `incremental`, a season whose games file, conference map, starting
+    Elo state and STAGE_VERSIONS are unchanged is read back instead of
+    recomputed.
+    """
     conference_mapping = load_conference_mapping()
 
     games_files = sorted(
@@ -22,23 +72,80 @@ def main() -> None:
         print('No games_*.csv files found to process.')
         return
 
+    SEASON_DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = SEASON_DATASET_DIR / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    conference_signature = _file_signature(CONFERENCE_MAP_PATH)
+
     elo_ratings = {}
     elo_last_season = {}
 
-    # Load and concatenate all seasons at once
-    dfs = []
-    for games_file in games_files:
-        year = get_year_from_games_filename(games_file)
-        print(f'Processing {games_file}...')
-        df = pd.read_csv(games_file)
-        df['season'] = int(year)
-        df = process_all_games(df, conference_mapping, elo_ratings, elo_last_season)
-        dfs.append(df)
+    years = [get_year_from_games_filename(games_file) for games_file in games_files]
+    pending = []
+    for games_file, year in zip(games_files, years):
+        starting_state = compact_elo_state(elo_ratings, elo_last_season)
+        inputs = {
+            'games': _file_signature(games_file),
+            'conference_map': conference_signature,
+            'elo': _elo_state_digest(starting_state),
+            'stage_versions': STAGE_VERSIONS,
+        }
+        elo_state = None
+        if incremental and manifest.get(year) == inputs and (SEASON_DATASET_DIR / f'dataset_{year}.csv').exists():
+            elo_state = load_elo_state(int(year))
+
+        if elo_state is not None:
+            print(f'Reusing unchanged season {year}')
+            elo_ratings, elo_last_season = elo_state
+        else:
+            games = pd.read_csv(games_file, usecols=lambda col: col in ELO_INPUT_COLUMNS)
+            games['season'] = int(year)
+            advance_elo_ratings(games, conference_mapping, elo_ratings, elo_last_season)
+            save_elo_state(int(year), elo_ratings, elo_last_season)
+            pending.append((games_file, year, starting_state, inputs))
+
+    built = {}
+    if pending:
+        pending_files, pending_years, starting_states, _ = zip(*pending)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_build_season, pending_files, pending_years, starting_states))
+        else:
+            results = list(map(_build_season, pending_files, pending_years, starting_states))
+
+        for (_, year, _, inputs), df in zip(pending, results):
+            df.to_csv(SEASON_DATASET_DIR / f'dataset_{year}.csv', index=False)
+            manifest[year] = inputs
+            built[year] = df
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    dfs = [
+        built[year] if year in built
+        else pd.read_csv(SEASON_DATASET_DIR / f'dataset_{year}.csv', float_precision='round_trip')
+        for year in years
+    ]
     all_games = pd.concat(dfs, ignore_index=True)
 
-    all_games.to_csv(PROJECT_ROOT / 'Game Predictions' / 'dataset.csv', index=False)
+    dataset_path = PROJECT_ROOT / 'Game Predictions' / 'dataset.csv'
+    all_games.to_csv(dataset_path, index=False)
     print(f'Wrote dataset.csv ({len(all_games)} rows)')
+    build_feature_store(dataset_path)
+    print('Wrote memory-mapped feature store')
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Build dataset.csv from the games_*.csv files.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild seasons whose games file (or an earlier season) changed since the last run",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used to build seasons in parallel (default: one per CPU)",
+    )
+    args = parser.parse_args()
+    main(incremental=args.incremental, workers=args.workers)
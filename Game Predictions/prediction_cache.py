@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from contextlib import closing
+import hashlib
+from pathlib import Path
+import sqlite3
+from typing import Sequence
+
+import numpy as np
+
+import cached_matchup
+import model_ensemble as ensemble
+
+CACHE_PATH = cached_matchup.DATA_DIR / "prediction_cache.sqlite"
+
+_FILE_HASH_CACHE: dict[tuple[str, int, int], str] = {}
+_BUNDLE_HASH_CACHE: list[tuple[tuple, str]] = []
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    season INTEGER NOT NULL,
+    team_a_id INTEGER NOT NULL,
+    team_b_id INTEGER NOT NULL,
+    season_type INTEGER NOT NULL,
+    home_away INTEGER NOT NULL,
+    data_hash TEXT NOT NULL,
+    model_hash TEXT NOT NULL,
+    win_prob REAL NOT NULL,
+    spread REAL NOT NULL,
+    PRIMARY KEY (season, team_a_id, team_b_id, season_type, home_away, data_hash, model_hash)
+)
+"""
+
+
+def _file_hash(path: Path) -> str:
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _FILE_HASH_CACHE:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(1 << 20), b''):
+                digest.update(block)
+        _FILE_HASH_CACHE[key] = digest.hexdigest()
+    return _FILE_HASH_CACHE[key]
+
+
+def data_snapshot_hash(season: int) -> str:
+    """Hash of the files a season's feature rows are built from."""
+    paths = [
+        cached_matchup._season_rows_path(season),
+        cached_matchup.GAME_RESULTS_DIR / f"games_{int(season)}.csv",
+    ]
+    return hashlib.sha1("".join(_file_hash(path) for path in paths if path.exists()).encode()).hexdigest()
+
+
+def model_bundle_hash(model_bundle: dict) -> str:
+    """
+    The file fingerprint for bundles straight from `load_models`; any other
+    bundle is hashed by its model objects.
+    """
+    fingerprint = ensemble.trusted_fingerprint(model_bundle)
+    if fingerprint is not None:
+        return fingerprint
+    import joblib
+
+    models = ensemble.bundle_models(model_bundle)
+    for known_models, bundle_hash in _BUNDLE_HASH_CACHE:
+        if ensemble._same_models(known_models, models):
+            return bundle_hash
+    bundle_hash = joblib.hash(models)
+    _BUNDLE_HASH_CACHE.append((models, bundle_hash))
+    return bundle_hash
+
+
+def _mirror_home_away(home_away: int) -> int:
+    return 2 if home_away == 2 else (0 if home_away == 1 else 1)
+
+
+def _connect(cache_path: Path) -> sqlite3.Connection:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def predict_matchups(
+    matchups: Sequence[tuple[str, str, int, int]],
+    season: int,
+    model_bundle: dict | None = None,
+    cache_path: Path | str | None = None,
+    *,
+    gui_adjustment: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Meta-ensemble win probabilities and spreads for
+    `(team_a, team_b, season_type, team_a_home_away)` matchups, memoized on
+    disk.
+
+    Entries are keyed by the resolved team ids, season data hash and model bundle hash, so
+    they go stale on their own when either changes. Each new prediction also
+    stores the mirrored matchup as `(1 - win_prob, -spread)`.
+
+    With `gui_adjustment`, rows first get the GUI's own home/away shift
+    (`ensemble.apply_gui_adjustments`); those predictions are cached apart.
+    """
+    model_bundle = model_bundle or ensemble.load_models()
+    data_hash = data_snapshot_hash(season)
+    model_hash = model_bundle_hash(model_bundle) + (":gui" if gui_adjustment else "")
+    keys = [
+        (
+            cached_matchup._resolve_team_id(season, team_a),
+            cached_matchup._resolve_team_id(season, team_b),
+            int(season_type),
+            int(home_away),
+        )
+        for team_a, team_b, season_type, home_away in matchups
+    ]
+
+    with closing(_connect(Path(cache_path or CACHE_PATH))) as conn:
+        rows = conn.execute(
+            "SELECT team_a_id, team_b_id, season_type, home_away, win_prob, spread FROM predictions "
+            "WHERE season = ? AND data_hash = ? AND model_hash = ?",
+            (int(season), data_hash, model_hash),
+        ).fetchall()
+        known = {tuple(row[:4]): (row[4], row[5]) for row in rows}
+
+        first_seen = {}
+        for matchup, key in zip(matchups, keys):
+            if key not in known:
+                first_seen.setdefault(key, matchup)
+        missing = list(first_seen)
+        if missing:
+            feature_rows = cached_matchup.build_prediction_feature_rows(list(first_seen.values()), int(season))
+            if gui_adjustment:
+                feature_rows = ensemble.apply_gui_adjustments(feature_rows)
+            win_probs, spreads = ensemble.predict_meta_ensemble_batch(feature_rows, model_bundle)
+
+            records = []
+            for (team_a, team_b, season_type, home_away), win_prob, spread in zip(missing, win_probs, spreads):
+                known[(team_a, team_b, season_type, home_away)] = (float(win_prob), float(spread))
+                records.append((team_a, team_b, season_type, home_away, float(win_prob), float(spread)))
+                mirrored = (team_b, team_a, season_type, _mirror_home_away(home_away))
+                if mirrored not in known:
+                    known[mirrored] = (1.0 - float(win_prob), -float(spread))
+                    records.append(mirrored + known[mirrored])
+
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (int(season), team_a, team_b, season_type, home_away, data_hash, model_hash, win_prob, spread)
+                        for team_a, team_b, season_type, home_away, win_prob, spread in records
+                    ],
+                )
+
+    results = np.array([known[key] for key in keys], dtype=float).reshape(-1, 2)
+    return results[:, 0], results[:, 1]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PARQUET = True
+except ImportError:
+    _HAS_PARQUET = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHED_DATA_DIR = PROJECT_ROOT / "Data" / "cached_data"
+
+DATE_COLUMNS = ['game_date']
+STRING_COLUMNS = ['short_conference_name', 'short_conference_name_opponent', 'team_name', 'team_name_opponent']
+ID_COLUMNS = ['game_id', 'team_id', 'season', 'season_type', 'team_home_away', 'team_winner', 'games_played']
+
+
+def _season_file(season: int, suffix: str, directory: Path | str | None = None) -> Path:
+    return Path(directory or CACHED_DATA_DIR) / f"df_{int(season)}{suffix}"
+
+
+def season_rows_path(season: int, directory: Path | str | None = None) -> Path:
+    """The stored season rows, preferring Parquet over the legacy CSV."""
+    for suffix in ('.parquet', '.csv'):
+        path = _season_file(season, suffix, directory)
+        if path.exists() and (suffix != '.parquet' or _HAS_PARQUET):
+            return path
+    raise FileNotFoundError(f"Missing cached season rows: {_season_file(season, '.csv', directory)}")
+
+
+def typed_season_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the storage schema: datetime64 dates, int32 ids and flags, text
+    columns left as strings and float32 for every other column. A column
+    not listed here is only made float32 when all of its values are numeric.
+    """
+    typed = df.copy()
+    for col in typed.columns:
+        if col in DATE_COLUMNS:
+            typed[col] = pd.to_datetime(typed[col], errors='coerce')
+        elif col in STRING_COLUMNS:
+            typed[col] = typed[col].astype(object)
+        elif col in ID_COLUMNS:
+            typed[col] = pd.to_numeric(typed[col], errors='coerce').fillna(0).astype(np.int32)
+        else:
+            numeric = pd.to_numeric(typed[col], errors='coerce')
+            if numeric.notna().sum() == typed[col].notna().sum():
+                typed[col] = numeric.astype(np.float32)
+            else:
+                typed[col] = typed[col].astype(object)
+    return typed
+
+
+def write_season_rows(df: pd.DataFrame, season: int, directory: Path | str | None = None) -> Path:
+    """
+    Store a season's team-game rows as typed Parquet, or as CSV when no
+    Parquet engine is installed. A stale file in the other format is removed
+    so readers never pick it up.
+    """
+    Path(directory or CACHED_DATA_DIR).mkdir(parents=True, exist_ok=True)
+    parquet_path = _season_file(season, '.parquet', directory)
+    csv_path = _season_file(season, '.csv', directory)
+    if _HAS_PARQUET:
+        typed_season_rows(df).to_parquet(parquet_path, index=False)
+        csv_path.unlink(missing_ok=True)
+        return parquet_path
+    df.to_csv(csv_path, index=False)
+    parquet_path.unlink(missing_ok=True)
+    return csv_path
+
+
+def read_season_rows_file(path: Path | str, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    path = Path(path)
+    columns = list(columns) if columns is not None else None
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path, usecols=columns)
+    return typed_season_rows(df)
+
+
+def read_season_rows(
+    season: int,
+    columns: Sequence[str] | None = None,
+    directory: Path | str | None = None,
+) -> pd.DataFrame:
+    """Load a season's stored rows, reading only `columns` when given."""
+    return read_season_rows_file(season_rows_path(season, directory), columns)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STAGE_CACHE_DIR = PROJECT_ROOT / "Data" / "cached_data" / "stages"
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Hash of a frame's contents, column names and dtypes."""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(*parts) -> str:
+    """Hash of a stage's inputs: upstream keys, input digests, versions and options."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class StageCache:
+    """
+    Pipeline stage outputs on disk, addressed by the hash of their inputs.
+
+    Entries live at `{stage}/{slot}_{key}.pkl`. Storing a new entry for a
+    stage and slot (a season) removes the older ones, so the cache holds one
+    version of each season per stage.
+    """
+
+    def __init__(self, directory: Path | str = STAGE_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, stage: str, slot: object, key: str) -> Path:
+        return self.directory / stage / f"{slot}_{key}.pkl"
+
+    def load(self, stage: str, slot: object, key: str) -> pd.DataFrame | None:
+        path = self._path(stage, slot, key)
+        if not path.exists():
+            return None
+        return pd.read_pickle(path)
+
+    def store(self, stage: str, slot: object, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        path = self._path(stage, slot, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob(f"{slot}_*.pkl"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(temp_path)
+        temp_path.replace(path)
+        return df
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import difflib
+import json
+from pathlib import Path
+import re
+import unicodedata
+
+import pandas as pd
+
+from bounded_cache import BoundedCache
+import data_processing as dp
+
+RESOLVER_CACHE_DIR = dp.DATA_DIR / "cached_data"
+FUZZY_CUTOFF = 0.85
+# Bump when `TeamResolver.from_games` changes so persisted resolvers are rebuilt.
+RESOLVER_VERSION = 1
+TEAM_INFO_COLUMNS = ['team_location', 'team_color', 'team_alternate_color', 'team_logo']
+
+# Extra spellings seen in brackets and other sources, keyed by the games-file location.
+TEAM_ALIASES = {
+    "Hawai'i": ['Hawaii'],
+    'Saint Francis': ['St. Francis (PA)', 'St. Francis PA'],
+    'San Jose State': ['San JosÃƒÂ© St', 'San Jose St'],
+    'UConn': ['Connecticut'],
+    'Ole Miss': ['Mississippi'],
+    'Pennsylvania': ['Penn'],
+    'Miami': ['Miami (FL)', 'Miami FL'],
+    'Long Island University': ['LIU'],
+    'Queens University': ['Queens'],
+}
+
+_RESOLVER_CACHE = BoundedCache(32 * 1024 ** 2, name="team_resolver")
+
+
+def _team_key(value: object) -> str:
+    return str(value).strip().lower()
+
+
+def normalize_team_name(value: object) -> str:
+    """
+    Spelling-insensitive key: accents, punctuation and case are dropped, '&'
+    reads as 'and', a leading 'Saint' as 'St' and a trailing 'St' as 'State'.
+    """
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode()
+    text = text.lower().replace('&', ' and ').replace("'", '').replace('.', '')
+    text = re.sub(r'[^a-z0-9]+', ' ', text).strip()
+    text = re.sub(r'^saint\b', 'st', text)
+    text = re.sub(r'(?<=\w) st$', ' state', text)
+    return text
+
+
+def _extends_name(first: str, second: str) -> bool:
+    """Whether one normalized name is the other followed by more words."""
+    shorter, longer = sorted((first, second), key=len)
+    return longer.startswith(shorter + ' ')
+
+
+def _unambiguous(candidates: dict[str, set[int]]) -> dict[str, int]:
+    """
+    Keys that name exactly one team. A key shared by several team_ids is
+    dropped, so one team is never resolved as another.
+    """
+    ambiguous = sorted(key for key, team_ids in candidates.items() if len(team_ids) > 1)
+    if ambiguous:
+        print(f"Warning: dropping team names shared by several team_ids: {ambiguous}")
+    return {key: next(iter(team_ids)) for key, team_ids in candidates.items() if len(team_ids) == 1}
+
+
+class TeamResolver:
+    """
+    Every known spelling of a season's teams mapped to team_id, plus each
+    team's display metadata (colors, logo).
+    """
+
+    def __init__(self, exact: dict[str, int], aliases: dict[str, int], team_info: dict[int, dict]):
+        self.exact = exact
+        self.aliases = aliases
+        self.team_info_by_id = team_info
+        self._alias_keys = list(aliases)
+
+    @classmethod
+    def from_games(cls, games_df: pd.DataFrame) -> TeamResolver:
+        rows = games_df.dropna(subset=['team_location', 'team_id'])
+        exact: dict[str, set[int]] = {}
+        aliases: dict[str, set[int]] = {}
+        team_info: dict[int, dict] = {}
+        for row in rows.itertuples(index=False):
+            team_id = int(row.team_id)
+            location = dp.TEAM_LOCATION_REPLACEMENTS.get(row.team_location, row.team_location)
+            exact.setdefault(_team_key(location), set()).add(team_id)
+            spellings = [row.team_location, location] + TEAM_ALIASES.get(location, [])
+            for spelling in spellings:
+                aliases.setdefault(normalize_team_name(spelling), set()).add(team_id)
+            team_info[team_id] = {
+                col: (None if pd.isna(getattr(row, col, None)) else getattr(row, col, None))
+                for col in TEAM_INFO_COLUMNS
+            }
+            team_info[team_id]['team_location'] = location
+        return cls(_unambiguous(exact), _unambiguous(aliases), team_info)
+
+    def resolve(self, name: object, *, fuzzy: bool = False) -> int:
+        """
+        team_id for `name`; raises KeyError when no spelling matches. With
+        `fuzzy`, a close misspelling is accepted too, but never a name that
+        only adds words to (or drops words from) another team's name, such
+        as 'Texas A&M-CC' for 'Texas A&M'.
+        """
+        key = _team_key(name)
+        if key in self.exact:
+            return self.exact[key]
+        normalized = normalize_team_name(name)
+        if normalized in self.aliases:
+            return self.aliases[normalized]
+        if fuzzy:
+            matches = difflib.get_close_matches(normalized, self._alias_keys, n=1, cutoff=FUZZY_CUTOFF)
+            if matches and not _extends_name(normalized, matches[0]):
+                return self.aliases[matches[0]]
+        raise KeyError(f"Could not map team_location '{name}' to a team_id.")
+
+    def team_info(self, name: object) -> dict | None:
+        """Display metadata for `name`, tolerating misspellings."""
+        try:
+            return self.team_info_by_id.get(self.resolve(name, fuzzy=True))
+        except KeyError:
+            return None
+
+    def to_json(self) -> dict:
+        return {
+            'exact': self.exact,
+            'aliases': self.aliases,
+            'team_info': {str(team_id): info for team_id, info in self.team_info_by_id.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> TeamResolver:
+        return cls(
+            {key: int(team_id) for key, team_id in data['exact'].items()},
+            {key: int(team_id) for key, team_id in data['aliases'].items()},
+            {int(team_id): info for team_id, info in data['team_info'].items()},
+        )
+
+
+def _source_signature(games_path: Path) -> list:
+    stat = games_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _build_resolver(season: int, games_path: Path, cache_dir: Path) -> TeamResolver:
+    resolver_path = cache_dir / f"team_names_{int(season)}.json"
+    signature = _source_signature(games_path)
+    if resolver_path.exists():
+        stored = json.loads(resolver_path.read_text())
+        if stored.get('source') == signature and stored.get('version') == RESOLVER_VERSION:
+            return TeamResolver.from_json(stored)
+
+    header = pd.read_csv(games_path, nrows=0).columns
+    games_df = pd.read_csv(
+        games_path,
+        usecols=[col for col in ['team_id'] + TEAM_INFO_COLUMNS if col in header],
+        dtype={col: str for col in TEAM_INFO_COLUMNS},
+    )
+    resolver = TeamResolver.from_games(games_df)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    resolver_path.write_text(json.dumps({'source': signature, 'version': RESOLVER_VERSION, **resolver.to_json()}))
+    return resolver
+
+
+def load_team_resolver(
+    season: int,
+    games_dir: Path | str | None = None,
+    cache_dir: Path | str | None = None,
+) -> TeamResolver:
+    """
+    The season's resolver, built from `games_{season}.csv` once, persisted as
+    JSON next to the cached season rows and shared in memory until the games
+    file changes.
+    """
+    games_path = Path(games_dir or dp.GAME_RESULTS_DIR) / f"games_{int(season)}.csv"
+    if not games_path.exists():
+        raise FileNotFoundError(f"Missing games file for team mapping: {games_path}")
+    cache_dir = Path(cache_dir or RESOLVER_CACHE_DIR)
+    return _RESOLVER_CACHE.get_or_load(
+        (int(season), str(games_path.resolve())),
+        lambda: _build_resolver(season, games_path, cache_dir),
+        source_path=games_path,
+    )
@@ -19,6 +19,7 @@ from lightgbm import LGBMClassifier, LGBMRegressor
 import lightgbm as lgb
 import joblib
 from data_processing import load_and_prepare_dataset
+from model_ensemble import export_native_models
 
 # %% [markdown]
 # ## 2. Load And Prepare Dataset
@@ -555,4 +556,7 @@ joblib.dump(meta_model, 'models/meta_model.joblib')
 print("Models saved to the 'models' directory:")
 print("- models/lgbm_winner_model.joblib")
 print("- models/lgbm_spread_model.joblib")
-print("- models/meta_model.joblib")
\ No newline at end of file
+print("- models/meta_model.joblib")
+
+native_manifest = export_native_models('models')
+print(f"Native inference artifacts written next to {native_manifest}")
\ No newline at end of file